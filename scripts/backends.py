@@ -0,0 +1,262 @@
+import glob
+import os
+
+import pandas as pd
+
+import config
+from clean_and_aggregate_climate import RAW_FILE_PATTERN, aggregate_all, country_key
+from clean_price import OUTLIER_IQR_MULTIPLIER, calculate_average_price, clean_trade_data_v2
+from combine_price_sources import (PRICE_SERIES, aggregate_prices, daily_price_source, load_daily_prices,
+                                   load_fx_rates, normalize_prices, prepare_daily_prices)
+from data_quality import validate
+from extract_trade_data import columns_to_extract_names, read_trade_raw, select_trade_columns
+
+# Polars is optional: it is imported when the lazy backend is first created, so runs on the
+# pandas backend never load it
+pl = None
+
+
+class Backend:
+    """
+    The core transformations behind one interface, so they can run on different DataFrame engines.
+    Every method takes file paths and returns pandas DataFrames in the layout of the pandas stages.
+    `max_violation_rate` and `report_dir` are passed on to data_quality.validate().
+    """
+    name = None
+
+    def aggregate_climate(self, raw_dir: str) -> pd.DataFrame:
+        """Yearly climate statistics of all raw files, with a 'country' column (see aggregate_all())."""
+        raise NotImplementedError
+
+    def average_trade_price(self, trade_raw_file: str, remove_outliers: bool = True, max_violation_rate: float = None,
+                            report_dir: str = None) -> pd.DataFrame:
+        """Average trade price per 'refYear' and 'partnerDesc' (see calculate_average_price())."""
+        raise NotImplementedError
+
+    def aggregate_prices(self, daily_price_file: str, fx_rates_file: str, max_violation_rate: float = None,
+                         report_dir: str = None):
+        """
+        The validated daily prices (see load_daily_prices()) and the monthly and annual averages of
+        all series in US$/kg (see aggregate_prices()), as (daily_df, monthly_avg_df, annual_avg_df).
+        """
+        raise NotImplementedError
+
+
+class PandasBackend(Backend):
+    """
+    The default backend: the eager pandas stage functions.
+    """
+    name = 'pandas'
+
+    def aggregate_climate(self, raw_dir: str) -> pd.DataFrame:
+        return aggregate_all(raw_dir)
+
+    def average_trade_price(self, trade_raw_file: str, remove_outliers: bool = True, max_violation_rate: float = None,
+                            report_dir: str = None) -> pd.DataFrame:
+        df = select_trade_columns(read_trade_raw(trade_raw_file))
+        return calculate_average_price(clean_trade_data_v2(df, remove_outliers=remove_outliers,
+                                                           max_violation_rate=max_violation_rate, report_dir=report_dir))
+
+    def aggregate_prices(self, daily_price_file: str, fx_rates_file: str, max_violation_rate: float = None,
+                         report_dir: str = None):
+        daily_df = load_daily_prices(daily_price_file, max_violation_rate=max_violation_rate, report_dir=report_dir)
+        monthly_avg_df, annual_avg_df = aggregate_prices(normalize_prices(daily_df, load_fx_rates(fx_rates_file)))
+        return daily_df, monthly_avg_df, annual_avg_df
+
+
+class PolarsBackend(Backend):
+    """
+    Lazy backend on Polars: each transformation is one query plan (scan -> filter -> group by)
+    that Polars optimizes as a whole and runs multi-threaded with its streaming engine, without
+    materializing the intermediate frames.
+    """
+    name = 'polars'
+
+    def __init__(self):
+        global pl
+        try:
+            import polars as pl
+        except ImportError:
+            raise ImportError("The 'polars' backend needs the polars package (pip install polars).") from None
+
+    @staticmethod
+    def _collect(*plans) -> list:
+        # Runs the plans together and hands the results over as pandas frames. The conversion
+        # goes through plain lists, so pyarrow is not needed on top of polars.
+        return [pd.DataFrame(df.to_dict(as_series=False)) for df in pl.collect_all(list(plans), engine='streaming')]
+
+    def aggregate_climate(self, raw_dir: str) -> pd.DataFrame:
+        plans = []
+        for file_path in sorted(glob.glob(os.path.join(raw_dir, RAW_FILE_PATTERN))):
+            # Skip the location metadata and the blank line above the daily table
+            plans.append(
+                pl.scan_csv(file_path, skip_rows=3, infer_schema=False)
+                .select(
+                    pl.lit(country_key(file_path)).alias('country'),
+                    pl.col('time').str.to_date('%Y-%m-%d').dt.year().alias('year'),
+                    pl.col('temperature_2m_mean (°C)').cast(pl.Float64, strict=False).alias('temperature'),
+                    pl.col('rain_sum (mm)').cast(pl.Float64, strict=False).alias('rain'),
+                )
+            )
+        if not plans:
+            return pd.DataFrame()
+
+        temperature, rain = pl.col('temperature'), pl.col('rain')
+        plan = (
+            pl.concat(plans)
+            .group_by('country', 'year')
+            .agg(
+                temperature_mean_yearly=temperature.mean(),
+                temperature_min_yearly=temperature.min(),
+                temperature_max_yearly=temperature.max(),
+                rain_sum_yearly=rain.sum(),
+                rain_mean_yearly=rain.mean(),
+                rain_min_yearly=rain.min(),
+                rain_max_yearly=rain.max(),
+            )
+            .sort('country', 'year')
+        )
+        return self._collect(plan)[0]
+
+    def average_trade_price(self, trade_raw_file: str, remove_outliers: bool = True, max_violation_rate: float = None,
+                            report_dir: str = None) -> pd.DataFrame:
+        value = pl.col('valuePerUnit')
+        # The raw export is latin1; the only non-ASCII name is fixed by the regex below anyway
+        extracted = (
+            pl.scan_csv(trade_raw_file, infer_schema=False, encoding='utf8-lossy')
+            .select(columns_to_extract_names)
+            .with_columns(
+                pl.col('refYear').cast(pl.Int64, strict=False),
+                pl.col('fobvalue', 'netWgt').cast(pl.Float64, strict=False),
+            )
+        )
+        plan = (
+            extracted.with_columns(value.cast(pl.Float64, strict=False))
+            # The 'drop' rules of data_quality.RULES['trade']
+            .drop_nulls()
+            .filter(value > 0)
+            .with_columns(pl.col('partnerDesc').str.replace_all(r"(?i)C.*?e d'Ivoire", "Cote d'Ivoire"))
+        )
+        if remove_outliers:
+            q1 = value.quantile(0.25, interpolation='linear')
+            q3 = value.quantile(0.75, interpolation='linear')
+            iqr = q3 - q1
+            plan = plan.filter(value.is_between(q1 - OUTLIER_IQR_MULTIPLIER * iqr, q3 + OUTLIER_IQR_MULTIPLIER * iqr))
+
+        plan = (
+            plan.group_by('refYear', 'partnerDesc')
+            .agg(value.mean().alias('Avg_Price_Per_Unit'))
+            .sort('refYear', 'partnerDesc')
+        )
+        extracted_df, average_df = self._collect(extracted, plan)
+        # The extracted records go through the same validation as with the pandas backend (fail
+        # fast, report); the rows its 'drop' rules remove are already left out of the plan
+        validate(extracted_df, 'trade', max_violation_rate=max_violation_rate, report_dir=report_dir)
+        return average_df
+
+    def aggregate_prices(self, daily_price_file: str, fx_rates_file: str, max_violation_rate: float = None,
+                         report_dir: str = None):
+        # The file as read_daily_price_file() returns it: prices parsed, empty rows dropped
+        raw = (
+            pl.scan_csv(daily_price_file, infer_schema=False)
+            .with_columns(pl.all().replace('', None))
+            .with_columns(pl.col(column).str.replace_all(',', '').cast(pl.Float64) for column in PRICE_SERIES)
+            .filter(~pl.all_horizontal(pl.all().is_null()))
+        )
+        plan = raw.with_columns(pl.col('Date').str.to_date('%d/%m/%Y', strict=False)).drop_nulls('Date').sort('Date')
+
+        # As-of join of the latest known FX rate per currency (see normalize_prices())
+        currencies = sorted({currency for _, currency in PRICE_SERIES.values()} - {'USD'})
+        fx_rates = None
+        if os.path.exists(fx_rates_file):
+            fx_rates = pl.scan_csv(fx_rates_file, schema_overrides={'Date': pl.Date, 'usd_per_unit': pl.Float64})
+        for currency in currencies:
+            if fx_rates is None:
+                plan = plan.with_columns(pl.lit(None, dtype=pl.Float64).alias(currency))
+                continue
+            rates = (fx_rates.filter(pl.col('currency') == currency)
+                     .select('Date', pl.col('usd_per_unit').alias(currency)).sort('Date'))
+            plan = plan.join_asof(rates, on='Date')
+        plan = plan.with_columns(pl.lit(1.0).alias('USD'))
+
+        columns = [column for column, _ in PRICE_SERIES.values()]
+        plan = plan.select(
+            pl.col('Date').dt.month_end().alias('Month'),
+            *[(pl.col(raw) * pl.col(currency) / 1000).alias(column)
+              for raw, (column, currency) in PRICE_SERIES.items()],
+        )
+
+        # One monthly grouping; the annual averages come from the monthly sums and counts
+        monthly = plan.group_by('Month').agg(
+            *[pl.col(c).sum().alias(f'{c}_sum') for c in columns],
+            *[pl.col(c).count().alias(f'{c}_count') for c in columns],
+        ).sort('Month')
+        annual = monthly.group_by(pl.col('Month').dt.year().alias('Year')).agg(pl.all().exclude('Month').sum())
+        averages = [(pl.col(f'{c}_sum') / pl.col(f'{c}_count')).alias(c) for c in columns]
+
+        raw_df, monthly_df, annual_df = self._collect(
+            raw,
+            monthly.select('Month', *averages),
+            annual.select('Year', *averages).sort('Year'),
+        )
+        # The daily frame goes through the same validation as with the pandas backend
+        daily_df = prepare_daily_prices(raw_df, max_violation_rate=max_violation_rate, report_dir=report_dir)
+        monthly_avg_df = monthly_df.set_index('Month')
+        monthly_avg_df.index = pd.to_datetime(monthly_avg_df.index)
+        return daily_df, monthly_avg_df, annual_df.set_index('Year')
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'polars': PolarsBackend,
+}
+
+
+def get_backend(name: str = 'pandas') -> Backend:
+    """
+    Returns an instance of the named backend (see BACKENDS).
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+# --- Parity Check ---
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # Compare on values only: index as columns, months as 'YYYY-MM', empty rows dropped
+    df = df.reset_index() if df.index.name else df.reset_index(drop=True)
+    if 'Month' in df.columns:
+        df['Month'] = pd.to_datetime(df['Month']).dt.strftime('%Y-%m')
+    value_columns = df.select_dtypes('number').columns
+    df = df.dropna(how='all', subset=[c for c in value_columns if c not in ('Year', 'year', 'refYear')])
+    return df.reset_index(drop=True).astype({c: 'float64' for c in value_columns})
+
+
+def check_parity(backend: str = 'polars', rtol: float = 1e-9) -> bool:
+    """
+    Runs every transformation on the pandas backend and on `backend` with the configured inputs,
+    and checks that the outputs are identical (up to floating point summation order).
+
+    Raises:
+        AssertionError: If any output differs.
+    """
+    reference, candidate = get_backend('pandas'), get_backend(backend)
+    trade_raw, daily_price, fx_rates = config.get_path('trade_raw'), daily_price_source(), config.get_path('fx_rates')
+    climate_dir = config.get_path('climate_raw_dir')
+
+    comparisons = {
+        'climate': (reference.aggregate_climate(climate_dir), candidate.aggregate_climate(climate_dir)),
+        'trade': (reference.average_trade_price(trade_raw), candidate.average_trade_price(trade_raw)),
+    }
+    reference_daily, reference_monthly, reference_annual = reference.aggregate_prices(daily_price, fx_rates)
+    candidate_daily, candidate_monthly, candidate_annual = candidate.aggregate_prices(daily_price, fx_rates)
+    comparisons['prices (daily)'] = (reference_daily, candidate_daily)
+    comparisons['prices (monthly)'] = (reference_monthly, candidate_monthly)
+    comparisons['prices (annual)'] = (reference_annual, candidate_annual)
+
+    for name, (expected, actual) in comparisons.items():
+        pd.testing.assert_frame_equal(_normalize(expected), _normalize(actual), check_dtype=False,
+                                      check_exact=False, rtol=rtol)
+        print(f"Parity OK: {name} ({len(expected)} rows) - pandas vs {backend}")
+    return True
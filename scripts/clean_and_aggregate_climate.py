@@ -2,14 +2,11 @@ import pandas as pd
 import glob
 import os
 
+import config
+
 # --- Configuration ---
-# Search pattern for all raw files (e.g., *_raw.csv)
+# Search pattern for all raw files (e.g., *_raw.csv) inside the configured 'climate_raw_dir'
 RAW_FILE_PATTERN = '*_raw.csv'
-OUTPUT_DIR = 'cleaned_yearly_data'
-
-# Create the output directory if it doesn't exist
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
 
 # --- Core Processing Function ---
 
@@ -77,39 +74,75 @@ def clean_and_aggregate_data(file_path):
 
     return df_yearly
 
-# --- Main Execution ---
+def country_key(file_path):
+    """
+    Returns the country key of a raw file name (e.g., 'climate_data_brazil_raw.csv' -> 'brazil').
+    """
+    base_name = os.path.basename(file_path)
+    return base_name.replace('_raw.csv', '').replace('climate_data_', '')
+
 
-def main():
+def aggregate_all(raw_dir):
     """
-    Main function to run the process for all raw climate files found in the directory.
+    Cleans and aggregates all raw climate files of a directory into one yearly table,
+    with the country key of each file in a 'country' column.
     """
-    # Find all raw files in the current directory
-    raw_files = glob.glob(RAW_FILE_PATTERN)
-    
+    raw_files = sorted(glob.glob(os.path.join(raw_dir, RAW_FILE_PATTERN)))
+
     if not raw_files:
-        print(f"ERROR: No files matching the pattern '{RAW_FILE_PATTERN}' found.")
-        print("Please ensure the script is in the same folder as your raw CSV files.")
-        return
+        print(f"ERROR: No files matching the pattern '{RAW_FILE_PATTERN}' found in '{raw_dir}'.")
+        return pd.DataFrame()
 
     print(f"Found {len(raw_files)} raw files to process.")
-    
-    # Process each file
+
+    frames = []
     for file_path in raw_files:
         df_yearly = clean_and_aggregate_data(file_path)
-        
         if df_yearly is not None:
-            # Create the output filename (e.g., 'climate_data_brazil_raw.csv' -> 'yearly_climate_data_brazil.csv')
-            base_name = os.path.basename(file_path)
-            country_name = base_name.replace('_raw.csv', '').replace('climate_data_', '')
-            output_file_name = os.path.join(OUTPUT_DIR, f'yearly_climate_data_{country_name}.csv')
-            
-            # Save the final, clean, and aggregated file
-            df_yearly.to_csv(output_file_name, index=False)
-            print(f"Successfully saved clean data to: {output_file_name}")
-            
+            df_yearly.insert(0, 'country', country_key(file_path))
+            frames.append(df_yearly)
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def save_yearly_files(df_all, output_dir):
+    """
+    Saves the yearly table as one file per country (e.g., 'yearly_climate_data_brazil_clean.csv').
+    """
+    # Create the output directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    for country_name, df_yearly in df_all.groupby('country', sort=False):
+        output_file_name = os.path.join(output_dir, f'yearly_climate_data_{country_name}_clean.csv')
+
+        # Save the final, clean, and aggregated file
+        df_yearly.drop(columns=['country']).to_csv(output_file_name, index=False)
+        print(f"Successfully saved clean data to: {output_file_name}")
+
+
+# --- Main Execution ---
+
+def main(raw_dir: str = None, output_dir: str = None):
+    """
+    Main function to run the process for all raw climate files found in the raw directory.
+
+    Args:
+        raw_dir (str): Defaults to the configured 'climate_raw_dir' path.
+        output_dir (str): Defaults to the configured 'climate_clean_dir' path.
+    """
+    raw_dir = raw_dir or config.get_path('climate_raw_dir')
+    output_dir = output_dir or config.get_path('climate_clean_dir')
+
+    df_all = aggregate_all(raw_dir)
+    if df_all.empty:
+        return
+
+    save_yearly_files(df_all, output_dir)
+
     print("\n--- Processing Complete ---")
-    print(f"All yearly files are saved in the '{OUTPUT_DIR}' folder.")
+    print(f"All yearly files are saved in the '{output_dir}' folder.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
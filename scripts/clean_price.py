@@ -1,12 +1,15 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import re
-FILE_PATH = '../datasets/price/raw/trade_data_extracted.csv'
-OUTPUT_FILE_PATH = '../datasets/price/clean/price_by_country_year.csv'
 
+import config
+from data_quality import DataQualityError, validate
 
-def clean_trade_data_v2(df: pd.DataFrame, remove_outliers: bool = False):
+# Values outside [Q1 - k * IQR, Q3 + k * IQR] are removed as extreme outliers
+OUTLIER_IQR_MULTIPLIER = 3.0
+
+
+def clean_trade_data_v2(df: pd.DataFrame, remove_outliers: bool = False, max_violation_rate: float = None,
+                        report_dir: str = None):
     """
     Cleans the trade data by applying a specific set of required cleaning steps,
     and optionally performs outlier removal.
@@ -14,7 +17,9 @@ def clean_trade_data_v2(df: pd.DataFrame, remove_outliers: bool = False):
     Args:
         df (pd.DataFrame): The input trade data DataFrame.
         remove_outliers (bool): If True, removes extreme outliers from 'valuePerUnit'
-                                using the IQR method (1.5 * IQR).
+                                using the IQR method (OUTLIER_IQR_MULTIPLIER * IQR).
+        max_violation_rate (float): Threshold of the data quality rules (see data_quality.validate()).
+        report_dir (str): Directory for the data quality report (None writes none).
 
     Returns:
         Optional[pd.DataFrame]: The cleaned DataFrame, or None if the input is empty.
@@ -26,14 +31,10 @@ def clean_trade_data_v2(df: pd.DataFrame, remove_outliers: bool = False):
     initial_rows = len(df)
     print(f"--- Starting Clean: Initial Rows = {initial_rows} ---")
 
-    # 0. Convert to numeric (turns non-numeric strings into NaN)
-    df['valuePerUnit'] = pd.to_numeric(df['valuePerUnit'], errors='coerce')
-
-    # 1. Drop all rows with missing values (NaN)
-    df_cleaned = df.dropna().reset_index(drop=True)
-    rows_dropped_missing = initial_rows - len(df_cleaned)
-    df = df_cleaned
-    print(f"Step 1: Dropped rows with missing data (NaN). Rows removed: {rows_dropped_missing}")
+    # 1. Validate (see data_quality.RULES['trade']): converts 'valuePerUnit' to numeric and drops
+    # incomplete or non-numeric records, failing fast if too many rows are affected
+    df = validate(df, 'trade', max_violation_rate=max_violation_rate, report_dir=report_dir)
+    print(f"Step 1: Dropped rows failing the data quality rules. Rows removed: {initial_rows - len(df)}")
 
     # 2. Standardize 'partnerDesc' (ROBUST FIX)
     # This uses a non-greedy wildcard regex to fix the failed character match ('C矌e d\'Ivoire').
@@ -59,7 +60,8 @@ def clean_trade_data_v2(df: pd.DataFrame, remove_outliers: bool = False):
 def remove_extreme_outliers(df: pd.DataFrame) -> pd.DataFrame:
     """
     Removes extreme outliers from the 'valuePerUnit' column using the IQR method.
-    The IQR method defines outliers as values outside 1.5 * IQR (Interquartile Range).
+    The IQR method defines outliers as values more than OUTLIER_IQR_MULTIPLIER * IQR
+    (Interquartile Range) below Q1 or above Q3.
     """
     if df.empty:
         return df
@@ -70,7 +72,7 @@ def remove_extreme_outliers(df: pd.DataFrame) -> pd.DataFrame:
     IQR = Q3 - Q1
 
     # Define bounds for non-outliers
-    multiplier = 3.0
+    multiplier = OUTLIER_IQR_MULTIPLIER
     lower_bound = Q1 - multiplier * IQR
     upper_bound = Q3 + multiplier * IQR
 
@@ -110,7 +112,7 @@ def calculate_average_price(df: pd.DataFrame) -> pd.DataFrame:
     return avg_price_df
 
 
-def find_missing_country_years(avg_price_df: pd.DataFrame):
+def find_missing_country_years(avg_price_df: pd.DataFrame, plot: bool = True):
     """
     Identifies which (Year, Country) combinations are missing from the aggregated data
     and visualizes this missingness using a heatmap.
@@ -120,6 +122,7 @@ def find_missing_country_years(avg_price_df: pd.DataFrame):
 
     Args:
         avg_price_df (pd.DataFrame): The aggregated DataFrame (Avg_Price_Per_Unit).
+        plot (bool): If True, also draws the missing data heatmap.
     """
     if avg_price_df.empty:
         print("Missing Data Check: Aggregated DataFrame is empty.")
@@ -155,43 +158,55 @@ def find_missing_country_years(avg_price_df: pd.DataFrame):
         for year, countries in missing_by_year.items():
             print(f"Year {year}: Missing Countries: {', '.join(countries)}")
 
-        # --- NEW PLOTTING LOGIC: Heatmap ---
-        print("\n--- Generating Missing Data Heatmap ---")
-
-        # Create a pivot table from the merged data. The 'Avg_Price_Per_Unit' column
-        # is NaN for missing data and a value for present data.
-        heatmap_data = merged_df.pivot_table(
-            index='partnerDesc',
-            columns='refYear',
-            values='Avg_Price_Per_Unit'
-        )
-
-        # Create the missing matrix: 1 if NaN (missing), 0 if value exists (present)
-        missing_matrix = heatmap_data.isna().astype(int)
-        custom_cmap = ['#E0E0E0', '#8f8d8d']
-        # Plot the heatmap
-        plt.figure(figsize=(12, max(6, len(all_countries) * 0.5)))
-        sns.heatmap(
-            missing_matrix,
-            cbar=False,
-            cmap=custom_cmap,
-            linewidths=.5,
-            linecolor='lightgray',
-            annot=True,  # Show 0/1 markers on the plot
-            fmt='d'
-        )
-        plt.title('Heatmap of Missing Country Price Data by Year (1 = Missing)', fontsize=16)
-        plt.xlabel('Reference Year', fontsize=12)
-        plt.ylabel('Partner Country', fontsize=12)
-        plt.yticks(rotation=0)
-        plt.tight_layout()
-        plt.show()
-
-        print("Heatmap of missing data created successfully.")
+    if plot and not missing_data.empty:
+        plot_missing_country_years(merged_df)
 
     print("-" * 30)
 
 
+def plot_missing_country_years(merged_df: pd.DataFrame):
+    """
+    Draws a heatmap of the (Year, Country) grid, marking combinations without a price.
+    """
+    # Plotting libraries are only imported when a plot is actually requested
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    print("\n--- Generating Missing Data Heatmap ---")
+    all_countries = merged_df['partnerDesc'].unique()
+
+    # Create a pivot table from the merged data. The 'Avg_Price_Per_Unit' column
+    # is NaN for missing data and a value for present data.
+    heatmap_data = merged_df.pivot_table(
+        index='partnerDesc',
+        columns='refYear',
+        values='Avg_Price_Per_Unit'
+    )
+
+    # Create the missing matrix: 1 if NaN (missing), 0 if value exists (present)
+    missing_matrix = heatmap_data.isna().astype(int)
+    custom_cmap = ['#E0E0E0', '#8f8d8d']
+    # Plot the heatmap
+    plt.figure(figsize=(12, max(6, len(all_countries) * 0.5)))
+    sns.heatmap(
+        missing_matrix,
+        cbar=False,
+        cmap=custom_cmap,
+        linewidths=.5,
+        linecolor='lightgray',
+        annot=True,  # Show 0/1 markers on the plot
+        fmt='d'
+    )
+    plt.title('Heatmap of Missing Country Price Data by Year (1 = Missing)', fontsize=16)
+    plt.xlabel('Reference Year', fontsize=12)
+    plt.ylabel('Partner Country', fontsize=12)
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    plt.show()
+
+    print("Heatmap of missing data created successfully.")
+
+
 def plot_average_price(df: pd.DataFrame):
     """
     Generates a bar plot showing the average price per unit over time for all countries.
@@ -200,6 +215,9 @@ def plot_average_price(df: pd.DataFrame):
         print("Cannot plot: DataFrame is empty or missing required columns ('refYear', 'Avg_Price_Per_Unit').")
         return
 
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     sns.set_style("whitegrid")
     plt.figure(figsize=(15, 8))
 
@@ -229,42 +247,63 @@ def plot_average_price(df: pd.DataFrame):
 
 
 
-try:
-    # 1. Read the data
-    trade_df = pd.read_csv(FILE_PATH)
-
-    # 2. Execute the clean function WITH outlier removal (True)
-    # This should resolve the Indonesia 2003 issue by dropping the single extreme transaction.
-    cleaned_df = clean_trade_data_v2(trade_df.copy(), remove_outliers=True)
-
-    if cleaned_df is not None:
-        # 3. Execute the calculation function
-        avg_price_df = calculate_average_price(cleaned_df)
-
-        # 4. Execute the missing data check function (NEW)
-        find_missing_country_years(avg_price_df)
-
-        # 5. Execute the plotting function
-        plot_average_price(avg_price_df)
-
-        # 6. Save the aggregated file
-        avg_price_df.to_csv(OUTPUT_FILE_PATH, index=False)
-        print(f"Final results saved to: {OUTPUT_FILE_PATH}")
-
-        # 7. Check the Indonesia 2003 average price after treatment
-        indonesia_2003_check = avg_price_df[
-            (avg_price_df['partnerDesc'] == 'Indonesia') &
-            (avg_price_df['refYear'] == 2003)
-            ]
-        print("\n--- Validation Check: Indonesia 2003 Price ---")
-        if not indonesia_2003_check.empty:
-            print(
-                f"Indonesia 2003 Avg Price (after outlier removal): {indonesia_2003_check['Avg_Price_Per_Unit'].iloc[0]:.4f}")
-        else:
-            print("No Indonesia 2003 data remaining after cleaning.")
-
+def main(input_file: str = None, output_file: str = None, plot: bool = False, max_violation_rate: float = None,
+         report_dir: str = None):
+    """
+    Cleans the extracted trade data and saves the average price per country and year.
 
-except FileNotFoundError:
-    print(f"\nError: File not found at the expected path: {FILE_PATH}. Please ensure the file is uploaded.")
-except Exception as e:
-    print(f"\nAn unexpected error occurred during processing: {e}")
\ No newline at end of file
+    Args:
+        input_file (str): Defaults to the configured 'trade_extracted' path.
+        output_file (str): Defaults to the configured 'price_by_country_year' path.
+        plot (bool): If True, shows the missing data heatmap and the price bar chart.
+        max_violation_rate (float): Threshold of the data quality rules (see data_quality.validate()).
+        report_dir (str): Defaults to the configured 'quality_report_dir' path.
+
+    Raises:
+        DataQualityError: If the trade data or the aggregated table fails a data quality rule.
+                          Nothing is saved then.
+    """
+    input_file = input_file or config.get_path('trade_extracted')
+    output_file = output_file or config.get_path('price_by_country_year')
+    report_dir = report_dir or config.get_path('quality_report_dir')
+
+    try:
+        # 1. Read the data (round-trip parsing gives the values the in-memory pipeline works with)
+        trade_df = pd.read_csv(input_file, float_precision='round_trip')
+
+        # 2. Execute the clean function WITH outlier removal (True)
+        # This should resolve the Indonesia 2003 issue by dropping the single extreme transaction.
+        cleaned_df = clean_trade_data_v2(trade_df.copy(), remove_outliers=True,
+                                         max_violation_rate=max_violation_rate, report_dir=report_dir)
+
+        if cleaned_df is not None:
+            # 3. Execute the calculation function
+            avg_price_df = calculate_average_price(cleaned_df)
+
+            # 4. Execute the missing data check function (NEW)
+            find_missing_country_years(avg_price_df, plot=plot)
+
+            # 5. Execute the plotting function
+            if plot:
+                plot_average_price(avg_price_df)
+
+            # 6. Validate the aggregated table before it is saved: one row per country and year,
+            # and every average price plausible in US$/kg (this catches outliers like Indonesia 2003)
+            validate(avg_price_df, 'price_by_country_year', max_violation_rate=max_violation_rate,
+                     report_dir=report_dir)
+
+            # 7. Save the aggregated file
+            avg_price_df.to_csv(output_file, index=False)
+            print(f"Final results saved to: {output_file}")
+
+    except FileNotFoundError:
+        print(f"\nError: File not found at the expected path: {input_file}. Please ensure the file is uploaded.")
+    except DataQualityError:
+        # Not swallowed like the errors below: the command has to fail (and reports it), so a scheduled run notices
+        raise
+    except Exception as e:
+        print(f"\nAn unexpected error occurred during processing: {e}")
+
+
+if __name__ == "__main__":
+    main(plot=True)
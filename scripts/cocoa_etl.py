@@ -0,0 +1,262 @@
+import argparse
+import functools
+
+import config
+
+# Stage modules are imported inside the handlers, so a run only pays for the libraries its
+# subcommand needs (pandas for the cleaning stages; matplotlib/seaborn only when plotting).
+
+
+def fails_on_bad_data(handler):
+    # Stops the command with a non-zero exit code and the rule summary when the data breaks a quality rule
+    @functools.wraps(handler)
+    def run(args):
+        from data_quality import DataQualityError
+        try:
+            handler(args)
+        except DataQualityError as e:
+            raise SystemExit(f"Data quality check failed: {e}")
+    return run
+
+
+def run_fetch(args):
+    import fetch_raw_data
+    base_urls = dict(value.split('=', 1) for value in args.base_url or [])
+    fetch_raw_data.main(sources=args.sources, countries=args.countries, base_urls=base_urls)
+
+
+def run_extract_trade(args):
+    import extract_trade_data
+    extract_trade_data.extract_trade_data(overwrite=args.overwrite)
+
+
+@fails_on_bad_data
+def run_clean_price(args):
+    import clean_price
+    clean_price.main(plot=args.plot, max_violation_rate=args.max_violation_rate)
+
+
+def run_merge_prices(args):
+    import merge_price_snapshots
+    merge_price_snapshots.main(snapshot_files=args.snapshots, rebuild=args.rebuild)
+
+
+@fails_on_bad_data
+def run_combine_price(args):
+    import combine_price_sources
+    combine_price_sources.main(plot=args.plot, max_violation_rate=args.max_violation_rate)
+
+
+@fails_on_bad_data
+def run_price_stats(args):
+    import price_volatility
+    price_volatility.main(max_violation_rate=args.max_violation_rate)
+
+
+def run_clean_climate(args):
+    import clean_and_aggregate_climate
+    clean_and_aggregate_climate.main()
+
+
+def run_partition(args):
+    import partitioned_store
+    partitioned_store.main(tables=args.tables)
+
+
+def run_extract(args):
+    import os
+    import partitioned_store
+    root = os.path.join(config.get_path('warehouse_dir'), args.table)
+    df = partitioned_store.read_partitioned(root, countries=args.countries, years=args.years)
+    df.to_csv(args.output, index=False)
+    print(f"Extracted {len(df)} rows to: {args.output}")
+
+
+def parse_base_url(value: str) -> str:
+    # 'price=http://localhost:8080/prices.csv'
+    source, separator, url = value.partition('=')
+    if not separator or not source or not url:
+        raise argparse.ArgumentTypeError(f"Expected SOURCE=URL, got '{value}'.")
+    return value
+
+
+def parse_years(value: str) -> range:
+    # '1997' or '1997-2005' (inclusive)
+    first, _, last = value.partition('-')
+    return range(int(first), int(last or first) + 1)
+
+
+def run_snapshot(args):
+    import snapshot_store
+    unknown = sorted(set(args.stages) - set(snapshot_store.STAGES))
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(unknown)}")
+    store = snapshot_store.SnapshotStore(config.get_path('snapshot_dir'))
+    if args.action == 'create':
+        snapshot_store.main(stages=args.stages)
+    elif args.action == 'list':
+        for stage in args.stages or snapshot_store.STAGES:
+            for manifest in store.list_versions(stage):
+                print(f"{stage}\t{manifest['version']}\t{manifest['created_at']}\t{len(manifest['files'])} files")
+    elif args.action == 'checkout':
+        if not args.stages:
+            raise SystemExit("snapshot checkout needs the stages to check out, e.g. 'snapshot checkout star_schema'.")
+        for stage in args.stages:
+            try:
+                store.checkout(stage, args.target, version=args.version, as_of=args.as_of)
+            except ValueError as e:
+                raise SystemExit(str(e))
+
+
+@fails_on_bad_data
+def run_pipeline(args):
+    import pipeline
+    pipeline.run_pipeline(checkpoints=args.checkpoints, plot=args.plot, stages=pipeline.build_stages(args.backend),
+                          max_violation_rate=args.max_violation_rate)
+
+
+def run_check_backends(args):
+    import backends
+    backends.check_parity(args.backend)
+
+
+def run_correlations(args):
+    import correlation_analysis
+    correlation_analysis.main(n_resamples=args.resamples, confidence=args.confidence, seed=args.seed)
+
+
+def run_regression(args):
+    import panel_regression
+    panel_regression.main(max_lag=args.max_lag, max_variables=args.max_variables)
+
+
+def run_validate(args):
+    import data_quality
+    unknown = [name for name in args.datasets if name not in data_quality.DATASET_LOADERS]
+    if unknown:
+        raise SystemExit(f"Unknown datasets: {', '.join(unknown)}")
+    if not data_quality.main(args.datasets, max_violation_rate=args.max_violation_rate):
+        raise SystemExit(1)
+
+
+def run_eda(args):
+    import merged_data_eda
+    merged_data_eda.main()
+
+
+def add_max_violation_rate(subparser: argparse.ArgumentParser):
+    subparser.add_argument('--max-violation-rate', type=float,
+                           help='Share of violating rows at which a data quality rule fails (default: 0.05).')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cocoa-etl', description='Cocoa data warehouse ETL pipeline.')
+    parser.add_argument('--config', help=f'JSON config file with path overrides (default: ${config.CONFIG_ENV_VAR}).')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch = subparsers.add_parser('fetch', help='Download the raw datasets from their online sources.')
+    fetch.add_argument('--sources', nargs='+', choices=config.FETCH_SOURCES)
+    fetch.add_argument('--countries', nargs='+', choices=list(config.CLIMATE_LOCATIONS),
+                       help='Climate countries to fetch (default: all).')
+    fetch.add_argument('--base-url', action='append', type=parse_base_url, metavar='SOURCE=URL',
+                       help='Download a source from another URL, e.g. a local stub server (repeatable).')
+    fetch.set_defaults(handler=run_fetch)
+
+    extract_trade = subparsers.add_parser('extract-trade', help='Extract the used columns from the raw trade data.')
+    extract_trade.add_argument('--overwrite', action='store_true', help='Replace an existing extracted file.')
+    extract_trade.set_defaults(handler=run_extract_trade)
+
+    clean_price = subparsers.add_parser('clean-price', help='Clean trade data into the average price per country/year.')
+    clean_price.add_argument('--plot', action='store_true', help='Show the missing data and price charts.')
+    add_max_violation_rate(clean_price)
+    clean_price.set_defaults(handler=run_clean_price)
+
+    merge_prices = subparsers.add_parser('merge-prices', help='Merge overlapping daily price snapshots.')
+    merge_prices.add_argument('snapshots', nargs='*', help='Snapshot CSVs (default: the ICCO snapshots in datasets/).')
+    merge_prices.add_argument('--rebuild', action='store_true', help='Rebuild the merged series from scratch.')
+    merge_prices.set_defaults(handler=run_merge_prices)
+
+    combine_price = subparsers.add_parser('combine-price', help='Add the annual ICCO world price to the price table.')
+    combine_price.add_argument('--plot', action='store_true', help='Show the annual and comparison price charts.')
+    add_max_violation_rate(combine_price)
+    combine_price.set_defaults(handler=run_combine_price)
+
+    price_stats = subparsers.add_parser('price-stats', help='Add yearly price volatility/distribution measures.')
+    add_max_violation_rate(price_stats)
+    price_stats.set_defaults(handler=run_price_stats)
+
+    clean_climate = subparsers.add_parser('clean-climate', help='Aggregate daily climate data into yearly statistics.')
+    clean_climate.set_defaults(handler=run_clean_climate)
+
+    partition = subparsers.add_parser('partition', help='Write country/year partitioned copies of the tables.')
+    partition.add_argument('--tables', nargs='+', choices=['climate', 'price', 'fact_table'])
+    partition.set_defaults(handler=run_partition)
+
+    extract = subparsers.add_parser('extract', help='Extract a filtered slice of a partitioned table.')
+    extract.add_argument('table', choices=['climate', 'price', 'fact_table'])
+    extract.add_argument('--countries', nargs='+', help='Country names, e.g. Ghana "Cote d\'Ivoire".')
+    extract.add_argument('--years', type=parse_years, help='A year or an inclusive range, e.g. 1997-2005.')
+    extract.add_argument('--output', '-o', required=True, help='CSV file to write.')
+    extract.set_defaults(handler=run_extract)
+
+    snapshot = subparsers.add_parser('snapshot', help='Create, list or check out versions of the stage outputs.')
+    snapshot.add_argument('action', choices=['create', 'list', 'checkout'])
+    snapshot.add_argument('stages', nargs='*',
+                          help='Stages: climate_clean, price_clean, star_schema, warehouse '
+                               '(default: all; checkout needs at least one).')
+    snapshot.add_argument('--version', help='Version id to check out.')
+    snapshot.add_argument('--as-of', help='Check out the latest version at this ISO date/time (UTC).')
+    snapshot.add_argument('--target', default='.', help='Directory to check out into.')
+    snapshot.set_defaults(handler=run_snapshot)
+
+    run = subparsers.add_parser('pipeline', help='Run all stages in one process, passing DataFrames in memory.')
+    run.add_argument('--checkpoints', nargs='*',
+                     help='Frames to write to disk (default: the files the individual stages write).')
+    run.add_argument('--plot', action='store_true', help='Also regenerate the EDA charts.')
+    run.add_argument('--backend', default='pandas',
+                     help="DataFrame engine of the trade, price and climate stages: 'pandas' (default) or 'polars'.")
+    add_max_violation_rate(run)
+    run.set_defaults(handler=run_pipeline)
+
+    check_backends = subparsers.add_parser('check-backends',
+                                           help='Check that a backend produces the same outputs as pandas.')
+    check_backends.add_argument('backend', nargs='?', default='polars', help="Backend to check (default: 'polars').")
+    check_backends.set_defaults(handler=run_check_backends)
+
+    correlations = subparsers.add_parser('correlations',
+                                         help='Correlations with bootstrap confidence intervals per country.')
+    correlations.add_argument('--resamples', type=int, default=10000, help='Bootstrap resamples (default: 10000).')
+    correlations.add_argument('--confidence', type=float, default=0.95, help='Confidence level (default: 0.95).')
+    correlations.add_argument('--seed', type=int, default=42, help='Seed of the resampling (default: 42).')
+    correlations.set_defaults(handler=run_correlations)
+
+    regression = subparsers.add_parser('regression',
+                                       help='Fit yield regressions on lagged climate and price, in one batch.')
+    regression.add_argument('--max-lag', type=int, default=3, help='Largest climate lag in years (default: 3).')
+    regression.add_argument('--max-variables', type=int, default=2,
+                            help='Largest number of climate variables per spec (default: 2).')
+    regression.set_defaults(handler=run_regression)
+
+    validate = subparsers.add_parser('validate', help='Check the datasets against their data quality rules.')
+    validate.add_argument('datasets', nargs='*',
+                          help='trade, daily_prices, price_by_country_year and/or fact_table (default: all).')
+    add_max_violation_rate(validate)
+    validate.set_defaults(handler=run_validate)
+
+    eda = subparsers.add_parser('eda', help='Regenerate the EDA charts in docs/EDA.')
+    eda.set_defaults(handler=run_eda)
+
+    return parser
+
+
+def main(argv: list = None):
+    """
+    Entry point of the `cocoa-etl` command: `python scripts/cocoa_etl.py <subcommand> [options]`.
+    """
+    args = build_parser().parse_args(argv)
+    config.load_config(args.config)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,183 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
 
-# --- 1. Read the raw data of daily price ---
-df = pd.read_csv('../datasets/price/raw/daily_price_raw.csv')
-output_filename = '../datasets/price/clean/price_by_country_year.csv'
-df_target = pd.read_csv('../datasets/price/clean/price_by_country_year.csv')
+import config
+from data_quality import validate
 
-# --- 2. Extract and Clean the ICCO daily price (US$/tonne) ---
-df = df[['Date', 'ICCO daily price (US$/tonne)']].copy()
+# Daily price series: raw column -> (normalized column in US$/kg, currency of the raw column)
+PRICE_SERIES = {
+    'London futures (£ sterling/tonne)': ('London futures (US$/kg)', 'GBP'),
+    'New York futures (US$/tonne)': ('New York futures (US$/kg)', 'USD'),
+    'ICCO daily price (US$/tonne)': ('ICCO daily price (US$/kg)', 'USD'),
+    'ICCO daily price (Euro/tonne)': ('ICCO Euro price (US$/kg)', 'EUR'),
+}
 
-# Column names for processing
-price_column_old = 'ICCO daily price (US$/tonne)'
+# Column name of the ICCO world price that is merged into the per-country price table
 price_column_new = 'ICCO daily price (US$/kg)'
 
-# Remove commas and convert to float
-df[price_column_old] = (
-    df[price_column_old]
-    .str.replace(',', '', regex=False)
-    .astype(float)
-)
 
-# Convert 'Date' to datetime and set as index
-df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
-df.set_index('Date', inplace=True)
+def daily_price_source() -> str:
+    """
+    Returns the daily price file to read: the merged series of all snapshots (see
+    merge_price_snapshots.py), or the raw export if the snapshots have not been merged yet.
+    """
+    merged_file = config.get_path('daily_price_merged')
+    return merged_file if os.path.exists(merged_file) else config.get_path('daily_price_raw')
+
 
-# --- 3. Aggregate daily data into annual, and calculate the avg for that year ---
-annual_avg_df = df.resample('YE').mean()
+def read_daily_price_file(daily_price_file: str) -> pd.DataFrame:
+    """
+    Reads the daily price file as exported, without the empty trailing rows of the export.
+    """
+    # thousands=',' parses values like "3,932.33" directly, so no per-column string cleanup is needed.
+    # Round-trip parsing gives the correctly rounded floats, as other engines (e.g. Polars) parse them.
+    df = pd.read_csv(daily_price_file, thousands=',', float_precision='round_trip')
+    return df.dropna(how='all').reset_index(drop=True)
 
-# Convert units: US$/tonne to US$/kg (divide by 1000)
-annual_avg_df[price_column_new] = annual_avg_df[price_column_old] / 1000
-annual_avg_df = annual_avg_df.drop(columns=[price_column_old])
 
-# Rename the index for clarity
-annual_avg_df.index.name = 'Year'
+def prepare_daily_prices(df: pd.DataFrame, max_violation_rate: float = None, report_dir: str = None) -> pd.DataFrame:
+    """
+    Validates the daily prices as read from the file (see data_quality.RULES['daily_prices'])
+    and returns all price series as floats, indexed by date.
 
-# --- 4. Plot the annual price for each year ---
-plt.figure(figsize=(12, 6))
-plt.plot(annual_avg_df.index, annual_avg_df[price_column_new], marker='o', linestyle='-')
+    `max_violation_rate` and `report_dir` are passed on to data_quality.validate().
+    """
+    df = validate(df, 'daily_prices', max_violation_rate=max_violation_rate, report_dir=report_dir)
+    df = df.set_index('Date').sort_index()
 
-plt.title('Annual Average ICCO Price (US$/kg)', fontsize=16)
-plt.xlabel('Year', fontsize=12)
-plt.ylabel('Price (US$/kg)', fontsize=12)
-plt.grid(True, which='both', linestyle='--', linewidth=0.5)
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+    return df[list(PRICE_SERIES)].astype(float)
 
-# B. Prepare the annual_avg_df for merging
-df_icco_final = annual_avg_df.reset_index()
 
-# Extract the year number
-df_icco_final['refYear'] = df_icco_final['Year'].dt.year
+def load_daily_prices(daily_price_file: str, max_violation_rate: float = None, report_dir: str = None) -> pd.DataFrame:
+    """
+    Reads the daily price file once and prepares it (see prepare_daily_prices()).
+    """
+    return prepare_daily_prices(read_daily_price_file(daily_price_file), max_violation_rate=max_violation_rate,
+                                report_dir=report_dir)
 
-# Rename the price column to match df_target ('Avg_Price_Per_Unit')
-df_icco_final = df_icco_final.rename(columns={price_column_new: 'Avg_Price_Per_Unit'})
 
-# Add the 'partnerDesc' column and set the row name
-df_icco_final['partnerDesc'] = 'World Avg ICCO'
+def load_fx_rates(fx_rates_file: str) -> pd.DataFrame:
+    """
+    Reads the local FX-rate table (columns: Date, currency, usd_per_unit) into one column of
+    US$ per unit for each currency, indexed by date. Returns an empty table if the file is missing.
+    """
+    if not os.path.exists(fx_rates_file):
+        print(f"Warning: FX-rate table not found at {fx_rates_file}. Non-US$ series will be empty.")
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='Date'))
 
-# Select final columns to match df_target structure
-df_icco_final = df_icco_final[['refYear', 'partnerDesc', 'Avg_Price_Per_Unit']]
+    fx = pd.read_csv(fx_rates_file, parse_dates=['Date'])
+    return fx.pivot_table(index='Date', columns='currency', values='usd_per_unit').sort_index()
 
-# C. Concatenate the data
-# Filter out previous 'World Avg ICCO' entries before concatenating to avoid duplicates
-df_target_filtered = df_target[df_target['partnerDesc'] != 'World Avg ICCO']
-df_merged = pd.concat([df_target_filtered, df_icco_final], ignore_index=True)
 
+def normalize_prices(daily_df: pd.DataFrame, fx_rates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts every daily series to US$/kg in one vectorized step.
 
-# D. Save the result back to the original file
-df_merged.to_csv(output_filename, index=False)
-def sort (output_file):
-    # --- 1. Read and Sort Data by Year ---
-    dff = pd.read_csv(output_file)
+    Each trading day uses the latest FX rate known on that day, since the FX and cocoa
+    market calendars do not line up exactly.
+    """
+    currencies = [currency for _, currency in PRICE_SERIES.values()]
+    foreign = sorted(set(currencies) - {'USD'})
 
-    # Sort the data by refYear
-    df_sorted = dff.sort_values(by='refYear')
+    fx_rates = fx_rates.reindex(columns=foreign).reset_index()
+    fx_rates['Date'] = fx_rates['Date'].astype(daily_df.index.dtype)
+    rates = pd.merge_asof(daily_df.index.to_frame(index=False), fx_rates, on='Date')
+    rates['USD'] = 1.0
 
-    # Save the sorted data back to the file
-    df_sorted.to_csv(output_file, index=False)
-    return df_sorted
+    # US$/tonne -> US$/kg: divide by 1000
+    values = daily_df.to_numpy() * rates[currencies].to_numpy() / 1000
+    columns = [column for column, _ in PRICE_SERIES.values()]
+    return pd.DataFrame(values, index=daily_df.index, columns=columns)
 
 
+def aggregate_prices(usd_df: pd.DataFrame):
+    """
+    Aggregates all daily series into monthly and annual averages from one monthly resample.
+
+    The annual averages are derived from the monthly sums and counts, so they equal the
+    mean over all trading days of the year without resampling the daily data again.
+
+    Returns:
+        tuple: (monthly_avg_df indexed by month end, annual_avg_df indexed by year)
+    """
+    monthly = usd_df.resample('ME').agg(['sum', 'count'])
+    monthly_sums = monthly.xs('sum', axis=1, level=1)
+    monthly_counts = monthly.xs('count', axis=1, level=1)
+
+    monthly_avg_df = monthly_sums / monthly_counts
+    monthly_avg_df.index.name = 'Month'
+
+    years = monthly_sums.index.year
+    annual_avg_df = monthly_sums.groupby(years).sum() / monthly_counts.groupby(years).sum()
+    annual_avg_df.index.name = 'Year'
+
+    return monthly_avg_df, annual_avg_df
+
+
+def calculate_price_series(daily_price_file: str, fx_rates_file: str, max_violation_rate: float = None,
+                           report_dir: str = None):
+    """
+    Reads the daily prices once, normalizes all series to US$/kg and aggregates them.
+
+    Returns:
+        tuple: (monthly_avg_df, annual_avg_df), see aggregate_prices().
+    """
+    daily_df = load_daily_prices(daily_price_file, max_violation_rate=max_violation_rate, report_dir=report_dir)
+    usd_df = normalize_prices(daily_df, load_fx_rates(fx_rates_file))
+    return aggregate_prices(usd_df)
+
+
+def plot_annual_price(annual_avg_df: pd.DataFrame):
+    """
+    Plots the annual average ICCO price for each year.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(annual_avg_df.index, annual_avg_df[price_column_new], marker='o', linestyle='-')
+
+    plt.title('Annual Average ICCO Price (US$/kg)', fontsize=16)
+    plt.xlabel('Year', fontsize=12)
+    plt.ylabel('Price (US$/kg)', fontsize=12)
+    plt.grid(True, which='both', linestyle='--', linewidth=0.5)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.show()
+
+
+def merge_icco_price(df_target: pd.DataFrame, annual_avg_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Appends the annual ICCO price to the per-country price table as 'World Avg ICCO' rows.
+    """
+    # B. Prepare the annual_avg_df for merging
+    df_icco_final = annual_avg_df.reset_index()
+
+    # The annual index already holds the year number
+    df_icco_final['refYear'] = df_icco_final['Year']
+
+    # Rename the price column to match df_target ('Avg_Price_Per_Unit')
+    df_icco_final = df_icco_final.rename(columns={price_column_new: 'Avg_Price_Per_Unit'})
+
+    # Add the 'partnerDesc' column and set the row name
+    df_icco_final['partnerDesc'] = 'World Avg ICCO'
+
+    # Select final columns to match df_target structure
+    df_icco_final = df_icco_final[['refYear', 'partnerDesc', 'Avg_Price_Per_Unit']]
+
+    # C. Concatenate the data
+    # Filter out previous 'World Avg ICCO' entries before concatenating to avoid duplicates
+    df_target_filtered = df_target[df_target['partnerDesc'] != 'World Avg ICCO']
+    df_merged = pd.concat([df_target_filtered, df_icco_final], ignore_index=True)
+
+    return df_merged
+
+
+def sort_by_year(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sorts the merged price table by refYear.
+    """
+    return df.sort_values(by='refYear')
 
 
 def plot_country_vs_world_avg(df: pd.DataFrame):
@@ -93,6 +190,8 @@ def plot_country_vs_world_avg(df: pd.DataFrame):
         df (pd.DataFrame): DataFrame containing the merged price data.
                            Expected columns: ['refYear', 'partnerDesc', 'Avg_Price_Per_Unit'].
     """
+    import matplotlib.pyplot as plt
+
     # Separate data
     df_countries = df[df['partnerDesc'] != 'World Avg ICCO'].copy()
     df_world_avg = df[df['partnerDesc'] == 'World Avg ICCO'].copy()
@@ -161,4 +260,45 @@ def plot_country_vs_world_avg(df: pd.DataFrame):
 
     # Display the plot
     plt.show()
-plot_country_vs_world_avg(sort(output_filename))
\ No newline at end of file
+
+
+def main(daily_price_file: str = None, output_filename: str = None, plot: bool = False,
+         max_violation_rate: float = None, report_dir: str = None):
+    """
+    Aggregates all daily price series into monthly and annual tables, adds the annual ICCO
+    world price to the per-country price table and sorts it by year.
+
+    Args:
+        daily_price_file (str): Defaults to daily_price_source().
+        output_filename (str): Defaults to the configured 'price_by_country_year' path.
+        plot (bool): If True, shows the annual price and the country comparison charts.
+        max_violation_rate (float): Threshold of the data quality rules (see data_quality.validate()).
+        report_dir (str): Defaults to the configured 'quality_report_dir' path.
+    """
+    daily_price_file = daily_price_file or daily_price_source()
+    output_filename = output_filename or config.get_path('price_by_country_year')
+    report_dir = report_dir or config.get_path('quality_report_dir')
+
+    df_target = pd.read_csv(output_filename, float_precision='round_trip')
+    monthly_avg_df, annual_avg_df = calculate_price_series(daily_price_file, config.get_path('fx_rates'),
+                                                           max_violation_rate=max_violation_rate,
+                                                           report_dir=report_dir)
+
+    # Save the aggregates of all series, so later stages do not touch the daily file again
+    monthly_avg_df.to_csv(config.get_path('price_series_by_month'), date_format='%Y-%m')
+    annual_avg_df.to_csv(config.get_path('price_series_by_year'))
+
+    if plot:
+        plot_annual_price(annual_avg_df)
+
+    # D. Sort and save the result back to the original file (sorted in memory, so it is written once)
+    df_merged = merge_icco_price(df_target, annual_avg_df[[price_column_new]])
+    df_sorted = sort_by_year(df_merged)
+    df_sorted.to_csv(output_filename, index=False)
+
+    if plot:
+        plot_country_vs_world_avg(df_sorted)
+
+
+if __name__ == "__main__":
+    main(plot=True)
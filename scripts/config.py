@@ -0,0 +1,109 @@
+import json
+import os
+
+# --- Configuration ---
+# All dataset locations are resolved from here, so the scripts work no matter which directory they are
+# started from. Paths are relative to the project root unless they are absolute.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Optional JSON file overriding 'root', individual 'paths' and/or the download 'base_urls', e.g.
+# {"root": "/data/cocoa", "paths": {"daily_price_raw": "drops/daily_price_raw.csv"},
+#  "base_urls": {"price": "http://localhost:8080/daily-prices.csv"}}
+CONFIG_ENV_VAR = 'COCOA_ETL_CONFIG'
+
+DEFAULT_PATHS = {
+    # Raw inputs
+    'climate_raw_dir': 'datasets/climate/raw',
+    'trade_raw': 'datasets/price/raw/trade_data_raw.csv',
+    'trade_extracted': 'datasets/price/raw/trade_data_extracted.csv',
+    'daily_price_raw': 'datasets/price/raw/daily_price_raw.csv',
+    'cocoa_bean_prices_raw': 'datasets/production/cocoa_bean_prices_raw.csv',
+    'fx_rates': 'datasets/price/raw/fx_rates.csv',
+    'production_raw': 'datasets/production/cocoa_bean_production_raw.csv',
+    'yields_raw': 'datasets/production/cocoa_bean_yields_raw.csv',
+    'http_cache_dir': 'datasets/.http_cache',
+    # Cleaned outputs
+    'climate_clean_dir': 'datasets/climate/clean/cleaned_yearly_data_v2',
+    'price_by_country_year': 'datasets/price/clean/price_by_country_year.csv',
+    'daily_price_merged': 'datasets/price/clean/daily_price_merged.csv',
+    'price_series_by_month': 'datasets/price/clean/price_series_by_month.csv',
+    'price_series_by_year': 'datasets/price/clean/price_series_by_year.csv',
+    'price_statistics_by_year': 'datasets/price/clean/price_statistics_by_year.csv',
+    'merged_data_for_eda': 'datasets/merged_data_for_eda.csv',
+    # Star schema
+    'star_schema_dir': 'datasets/star_schema',
+    # Per-rule data quality reports
+    'quality_report_dir': 'datasets/quality',
+    # Analysis tables (for the dashboards)
+    'correlation_ci': 'datasets/analysis/correlation_bootstrap_ci.csv',
+    'regression_dir': 'datasets/analysis/panel_regression',
+    # Partitioned (country/year) copies of the warehouse tables
+    'warehouse_dir': 'datasets/warehouse',
+    # Content-addressed versions of the stage outputs
+    'snapshot_dir': 'datasets/.snapshots',
+    # Documentation
+    'eda_plot_dir': 'docs/EDA',
+}
+
+# Online sources of `cocoa_etl.py fetch` (see fetch_raw_data.py). Kept here rather than in the fetcher,
+# so the CLI can offer them as choices without importing aiohttp.
+FETCH_SOURCES = ['climate', 'trade', 'price', 'production', 'fx']
+
+# Climate: one location per country, named like the existing raw files (climate_data_<country>_raw.csv)
+CLIMATE_LOCATIONS = {
+    'brazil': (-10.017574, -54.929962),
+    'ghana': (8.119508, -1.231842),
+    'indonesia': (-5.026362, 120.04946),
+    'ivory_coast': (7.9789104, -5.533722),
+    'negeria': (10.017574, 8.038528),
+}
+
+_config = {'root': PROJECT_ROOT, 'paths': dict(DEFAULT_PATHS), 'base_urls': {}}
+
+
+def load_config(config_file: str = None) -> dict:
+    """
+    Loads the path configuration, applying overrides from a JSON config file.
+
+    Args:
+        config_file (str): Path of the JSON config file. Falls back to the file named
+                           by the COCOA_ETL_CONFIG environment variable, if set.
+
+    Returns:
+        dict: The active configuration ({'root': ..., 'paths': {...}, 'base_urls': {...}}).
+    """
+    config_file = config_file or os.environ.get(CONFIG_ENV_VAR)
+
+    _config['root'] = PROJECT_ROOT
+    _config['paths'] = dict(DEFAULT_PATHS)
+    _config['base_urls'] = {}
+
+    if config_file:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        # A relative root is taken relative to the config file itself
+        if 'root' in overrides:
+            _config['root'] = os.path.join(os.path.dirname(os.path.abspath(config_file)), overrides['root'])
+        _config['paths'].update(overrides.get('paths', {}))
+        _config['base_urls'].update(overrides.get('base_urls', {}))
+
+    return _config
+
+
+def get_path(name: str) -> str:
+    """
+    Returns the absolute path configured under `name` (see DEFAULT_PATHS).
+    """
+    if name not in _config['paths']:
+        raise KeyError(f"Unknown path '{name}'. Known paths: {', '.join(sorted(_config['paths']))}")
+    return os.path.normpath(os.path.join(_config['root'], _config['paths'][name]))
+
+
+def get_base_urls() -> dict:
+    """
+    Returns the configured overrides of the download base URLs (source -> URL).
+    """
+    return dict(_config['base_urls'])
+
+
+load_config()
@@ -0,0 +1,168 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# --- Configuration ---
+# Yield, price and the climate measures of 'merged_data_for_eda.csv'
+CORRELATION_VARIABLES = [
+    'Yield (tonnes/hectare)',
+    'Avg_Price_Per_Unit',
+    'yearly_avg_temperature',
+    'yearly_min_temperature',
+    'yearly_max_temperature',
+    'yearly_min_rainfall',
+    'yearly_max_rainfall',
+    'yearly_avg_rainfall',
+    'yearly_total_rainfall',
+]
+COUNTRY_COLUMN = 'Country'
+POOLED_LABEL = 'All countries'
+
+N_RESAMPLES = 10000
+CONFIDENCE_LEVEL = 0.95
+# Fixed seed, so the dashboard table only changes when the data does
+RANDOM_SEED = 42
+
+# Columns of the correlation table
+TABLE_COLUMNS = [COUNTRY_COLUMN, 'Variable 1', 'Variable 2', 'N', 'Correlation', 'CI Lower', 'CI Upper',
+                 'Bootstrap SE', 'Confidence Level', 'Resamples']
+
+
+def bootstrap_correlations(values: np.ndarray, n_resamples: int = N_RESAMPLES, rng=None) -> np.ndarray:
+    """
+    Computes the Pearson correlation matrix of `n_resamples` bootstrap resamples at once.
+
+    Instead of materializing every resample, each one is represented by how often it draws
+    each row (a count matrix built from all resample indices with a single bincount). The
+    means and cross products of all resamples then follow from two matrix products.
+
+    Args:
+        values (np.ndarray): (n_rows, n_variables) observations without missing values.
+        n_resamples (int): Number of bootstrap resamples.
+        rng (np.random.Generator): Random generator (default: seeded with RANDOM_SEED).
+
+    Returns:
+        np.ndarray: (n_resamples, n_variables, n_variables) correlation matrices. Entries of
+                    resamples in which a variable is constant are NaN.
+    """
+    rng = rng if rng is not None else np.random.default_rng(RANDOM_SEED)
+    n_rows, n_variables = values.shape
+
+    # Centering does not change correlations, but keeps the moment sums well-conditioned
+    centered = values - values.mean(axis=0)
+    cross_products = (centered[:, :, None] * centered[:, None, :]).reshape(n_rows, n_variables ** 2)
+
+    # weights[b, i] = share of resample b made up of row i
+    indices = rng.integers(0, n_rows, size=(n_resamples, n_rows))
+    offsets = np.arange(n_resamples)[:, None] * n_rows
+    weights = np.bincount((indices + offsets).ravel(), minlength=n_resamples * n_rows)
+    weights = weights.reshape(n_resamples, n_rows) / n_rows
+
+    means = weights @ centered
+    covariances = (weights @ cross_products).reshape(n_resamples, n_variables, n_variables)
+    covariances -= means[:, :, None] * means[:, None, :]
+
+    std = np.sqrt(np.clip(np.diagonal(covariances, axis1=1, axis2=2), 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlations = covariances / (std[:, :, None] * std[:, None, :])
+    correlations[~np.isfinite(correlations)] = np.nan
+    return correlations
+
+
+def correlation_table(df: pd.DataFrame, variables: list = None, n_resamples: int = N_RESAMPLES,
+                      confidence: float = CONFIDENCE_LEVEL, seed: int = RANDOM_SEED) -> pd.DataFrame:
+    """
+    Pearson correlations with percentile bootstrap confidence intervals for every pair of
+    variables, per country and pooled over all countries.
+
+    Rows with a missing value in any of the variables are left out (per group), and so are
+    pairs involving a variable that is constant within the group.
+
+    Args:
+        df (pd.DataFrame): The merged data ('merged_data_for_eda.csv').
+        variables (list): Columns to correlate (default: CORRELATION_VARIABLES).
+        n_resamples (int): Number of bootstrap resamples per group.
+        confidence (float): Confidence level of the intervals, e.g. 0.95.
+        seed (int): Seed of the resampling.
+
+    Returns:
+        pd.DataFrame: One row per group and variable pair, with the TABLE_COLUMNS (empty if every
+                      group was skipped).
+    """
+    variables = variables or CORRELATION_VARIABLES
+    rng = np.random.default_rng(seed)
+    alpha = 1 - confidence
+    pairs = np.triu_indices(len(variables), k=1)
+
+    groups = [(POOLED_LABEL, df)] + list(df.groupby(COUNTRY_COLUMN, sort=True))
+    tables = []
+    for group, group_df in groups:
+        values = group_df[variables].dropna().to_numpy(dtype=float)
+        if len(values) < 3:
+            print(f"{group}: fewer than 3 complete rows, skipped.")
+            continue
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            estimate = np.corrcoef(values, rowvar=False)
+
+        # Correlations with a variable that is constant in this group are undefined
+        defined = np.isfinite(estimate[pairs])
+        if not defined.all():
+            print(f"{group}: {(~defined).sum()} pairs with a constant variable skipped.")
+        first, second = pairs[0][defined], pairs[1][defined]
+
+        resampled = bootstrap_correlations(values, n_resamples, rng)[:, first, second]
+        lower, upper = np.nanquantile(resampled, [alpha / 2, 1 - alpha / 2], axis=0)
+
+        tables.append(pd.DataFrame({
+            COUNTRY_COLUMN: group,
+            'Variable 1': np.asarray(variables)[first],
+            'Variable 2': np.asarray(variables)[second],
+            'N': len(values),
+            'Correlation': estimate[first, second],
+            'CI Lower': lower,
+            'CI Upper': upper,
+            'Bootstrap SE': np.nanstd(resampled, axis=0, ddof=1),
+        }))
+
+    if not tables:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+    table = pd.concat(tables, ignore_index=True)
+    table['Confidence Level'] = confidence
+    table['Resamples'] = n_resamples
+    return table
+
+
+def main(input_file: str = None, output_file: str = None, n_resamples: int = N_RESAMPLES,
+         confidence: float = CONFIDENCE_LEVEL, seed: int = RANDOM_SEED):
+    """
+    Computes the bootstrap correlation table and saves it for the dashboards.
+
+    Args:
+        input_file (str): Defaults to the configured 'merged_data_for_eda' path.
+        output_file (str): Defaults to the configured 'correlation_ci' path.
+        n_resamples (int): Number of bootstrap resamples per group.
+        confidence (float): Confidence level of the intervals.
+        seed (int): Seed of the resampling.
+    """
+    input_file = input_file or config.get_path('merged_data_for_eda')
+    output_file = output_file or config.get_path('correlation_ci')
+
+    df = pd.read_csv(input_file)
+
+    start = time.perf_counter()
+    table = correlation_table(df, n_resamples=n_resamples, confidence=confidence, seed=seed)
+    print(f"--- Bootstrapped {table[COUNTRY_COLUMN].nunique()} groups x {n_resamples} resamples "
+          f"in {time.perf_counter() - start:.2f}s ---")
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    table.to_csv(output_file, index=False)
+    print(f"Correlation table saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
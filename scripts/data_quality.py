@@ -0,0 +1,265 @@
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# --- Configuration ---
+# A rule whose share of violating rows exceeds this rate stops the load (unless the rule sets its own max_rate)
+DEFAULT_MAX_VIOLATION_RATE = 0.05
+
+# Plausible cocoa prices per unit: a value outside these bounds is almost certainly in the wrong unit
+# (e.g. US$/tonne in a US$/kg column) rather than a real price
+USD_PER_KG_RANGE = {'lower': 0.01, 'upper': 100}
+USD_PER_TONNE_RANGE = {'lower': 100, 'upper': 50000}
+
+
+class DataQualityError(ValueError):
+    """Raised when a rule is violated by more rows than its threshold allows."""
+
+
+class Rule(NamedTuple):
+    """
+    One declarative data quality rule.
+
+    `check` names a function in CHECKS, which is called with the frame, `columns` and `params`
+    and returns a boolean mask of the violating rows. Rows violating a rule with action 'drop'
+    are removed from the validated frame; 'warn' rules are only reported.
+    """
+    name: str
+    check: str
+    columns: list
+    params: dict = None
+    action: str = 'drop'
+    max_rate: float = None
+
+
+# --- Checks ---
+# Each check returns a boolean numpy mask of the violating rows. 'numeric' and 'date' also convert
+# their columns in place, so they are listed before the rules that compare values.
+
+def check_not_null(df: pd.DataFrame, columns: list) -> np.ndarray:
+    return df[columns].isna().to_numpy().any(axis=1)
+
+
+def check_numeric(df: pd.DataFrame, columns: list) -> np.ndarray:
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        converted = pd.to_numeric(df[column], errors='coerce')
+        # Only values that were present but unparseable; missing values are not_null's concern
+        mask |= (converted.isna() & df[column].notna()).to_numpy()
+        df[column] = converted
+    return mask
+
+
+def check_date(df: pd.DataFrame, columns: list, format: str = None) -> np.ndarray:
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        converted = pd.to_datetime(df[column], format=format, errors='coerce')
+        mask |= (converted.isna() & df[column].notna()).to_numpy()
+        df[column] = converted
+    return mask
+
+
+def check_range(df: pd.DataFrame, columns: list, lower: float = -np.inf, upper: float = np.inf,
+                inclusive: str = 'both') -> np.ndarray:
+    values = df[columns]
+    return (~values.apply(lambda s: s.between(lower, upper, inclusive=inclusive)) & values.notna()).to_numpy().any(axis=1)
+
+
+def check_unique(df: pd.DataFrame, columns: list) -> np.ndarray:
+    return df.duplicated(columns, keep=False).to_numpy()
+
+
+def check_monotonic(df: pd.DataFrame, columns: list, direction: str = None) -> np.ndarray:
+    # Flags every row that steps against the direction of the series. Without a direction, the
+    # dominant one is used, so files sorted newest-first and oldest-first are both accepted.
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        steps = df[column].diff()
+        increasing = (steps > pd.Timedelta(0) if steps.dtype.kind == 'm' else steps > 0).to_numpy()
+        decreasing = (steps < pd.Timedelta(0) if steps.dtype.kind == 'm' else steps < 0).to_numpy()
+        column_direction = direction or ('increasing' if increasing.sum() >= decreasing.sum() else 'decreasing')
+        mask |= decreasing if column_direction == 'increasing' else increasing
+    return mask
+
+
+CHECKS = {
+    'not_null': check_not_null,
+    'numeric': check_numeric,
+    'date': check_date,
+    'range': check_range,
+    'unique': check_unique,
+    'monotonic': check_monotonic,
+}
+
+
+# --- Rule Sets ---
+TRADE_COLUMNS = ['refYear', 'partnerDesc', 'fobvalue', 'netWgt', 'valuePerUnit']
+
+RULES = {
+    # Extracted trade records (columns of extract_trade_data.columns_to_extract_names)
+    'trade': [
+        Rule('numeric_value_per_unit', 'numeric', ['valuePerUnit']),
+        Rule('complete_record', 'not_null', TRADE_COLUMNS),
+        Rule('positive_value_per_unit', 'range', ['valuePerUnit'], {'lower': 0, 'inclusive': 'neither'}),
+        Rule('value_per_unit_in_usd_per_kg', 'range', ['valuePerUnit'], USD_PER_KG_RANGE, action='warn'),
+    ],
+    # Daily ICCO price export (raw columns, before normalization)
+    'daily_prices': [
+        Rule('valid_date', 'date', ['Date'], {'format': '%d/%m/%Y'}),
+        Rule('date_present', 'not_null', ['Date']),
+        Rule('unique_date', 'unique', ['Date'], action='warn'),
+        Rule('monotonic_dates', 'monotonic', ['Date'], action='warn'),
+        Rule('icco_price_in_usd_per_tonne', 'range', ['ICCO daily price (US$/tonne)'], USD_PER_TONNE_RANGE,
+             action='warn'),
+        Rule('positive_prices', 'range',
+             ['London futures (£ sterling/tonne)', 'New York futures (US$/tonne)', 'ICCO daily price (US$/tonne)',
+              'ICCO daily price (Euro/tonne)'], {'lower': 0, 'inclusive': 'neither'}, action='warn'),
+    ],
+    # Average trade price per country and year
+    'price_by_country_year': [
+        Rule('keys_present', 'not_null', ['refYear', 'partnerDesc'], action='warn', max_rate=0),
+        Rule('unique_country_year', 'unique', ['refYear', 'partnerDesc'], action='warn', max_rate=0),
+        Rule('price_in_usd_per_kg', 'range', ['Avg_Price_Per_Unit'], USD_PER_KG_RANGE, action='warn', max_rate=0),
+    ],
+    # Star schema fact table
+    'fact_table': [
+        Rule('keys_present', 'not_null', ['country_id', 'date_id'], action='warn', max_rate=0),
+        Rule('unique_country_year', 'unique', ['country_id', 'date_id'], action='warn', max_rate=0),
+        Rule('price_in_usd_per_kg', 'range', ['Avg_Price_Per_Unit'], USD_PER_KG_RANGE, action='warn', max_rate=0),
+        Rule('positive_yield', 'range', ['Yield (kg/hectare)'], {'lower': 0, 'inclusive': 'neither'},
+             action='warn', max_rate=0),
+        Rule('non_negative_production', 'range', ['Production (kg)'], {'lower': 0}, action='warn', max_rate=0),
+        Rule('temperature_in_celsius', 'range',
+             ['Yearly Average Temperature', 'Yearly Min Temperature', 'Yearly Max Temperature'],
+             {'lower': -20, 'upper': 50}, action='warn'),
+        Rule('non_negative_rainfall', 'range',
+             ['Yearly Min Rainfall', 'Yearly Max Rainfall', 'Yearly Average Rainfall', 'Yearly Total Rainfall'],
+             {'lower': 0}, action='warn'),
+    ],
+}
+
+
+def evaluate(df: pd.DataFrame, rules: list) -> np.ndarray:
+    """
+    Evaluates all rules on the frame in one pass.
+
+    Returns:
+        np.ndarray: (n_rules, n_rows) boolean matrix, True where a row violates a rule.
+    """
+    masks = np.zeros((len(rules), len(df)), dtype=bool)
+    for i, rule in enumerate(rules):
+        masks[i] = CHECKS[rule.check](df, rule.columns, **(rule.params or {}))
+    return masks
+
+
+def validate(df: pd.DataFrame, dataset: str, max_violation_rate: float = None, report_dir: str = None,
+             rules: list = None) -> pd.DataFrame:
+    """
+    Checks a frame against the rule set of its dataset, optionally writes the per-rule report
+    and fails fast if any rule is violated too often.
+
+    Args:
+        df (pd.DataFrame): The data to check. Columns checked by 'numeric'/'date' rules are converted in place.
+        dataset (str): Name of the rule set in RULES; also the name of the report file.
+        max_violation_rate (float): Default threshold for rules without their own max_rate
+                                    (default: DEFAULT_MAX_VIOLATION_RATE).
+        report_dir (str): Directory to write the report to ('<dataset>.csv'). None writes no report;
+                          the stage entry points pass the configured 'quality_report_dir' path.
+        rules (list): Rules to use instead of RULES[dataset].
+
+    Returns:
+        pd.DataFrame: The rows that pass all 'drop' rules.
+
+    Raises:
+        DataQualityError: If a rule's violation rate exceeds its threshold.
+    """
+    rules = rules or RULES[dataset]
+    default_rate = DEFAULT_MAX_VIOLATION_RATE if max_violation_rate is None else max_violation_rate
+
+    masks = evaluate(df, rules)
+    violations = masks.sum(axis=1)
+    rates = violations / max(len(df), 1)
+    thresholds = np.array([default_rate if rule.max_rate is None else rule.max_rate for rule in rules])
+    failed = rates > thresholds
+
+    report = pd.DataFrame({
+        'Dataset': dataset,
+        'Rule': [rule.name for rule in rules],
+        'Check': [rule.check for rule in rules],
+        'Columns': [', '.join(rule.columns) for rule in rules],
+        'Action': [rule.action for rule in rules],
+        'Rows': len(df),
+        'Violations': violations,
+        'Violation Rate': rates,
+        'Max Rate': thresholds,
+        'Status': np.where(failed, 'failed', 'ok'),
+    })
+    report_file = None
+    if report_dir is not None:
+        os.makedirs(report_dir, exist_ok=True)
+        report_file = os.path.join(report_dir, f'{dataset}.csv')
+        report.to_csv(report_file, index=False)
+
+    print(f"--- Data Quality: {dataset} ({len(df)} rows) ---")
+    for rule, count, status in zip(rules, violations, report['Status']):
+        if count:
+            print(f"{rule.name}: {count} rows violate the rule ({rule.action}, {status})")
+
+    if failed.any():
+        details = ', '.join(f"{rule.name} {rate:.1%} > {threshold:.1%}"
+                            for rule, rate, threshold, fail in zip(rules, rates, thresholds, failed) if fail)
+        message = f"{dataset}: too many violations of {details}."
+        raise DataQualityError(message + (f" See the report: {report_file}" if report_file else ''))
+
+    drop = masks[[rule.action == 'drop' for rule in rules]].any(axis=0)
+    if drop.any():
+        print(f"Dropped {drop.sum()} rows violating a 'drop' rule.")
+    return df[~drop].reset_index(drop=True)
+
+
+# --- Standalone Validation ---
+
+def _load_daily_prices_raw() -> pd.DataFrame:
+    from combine_price_sources import read_daily_price_file
+    return read_daily_price_file(config.get_path('daily_price_raw'))
+
+
+# Dataset -> loader of its file at the configured location
+DATASET_LOADERS = {
+    'trade': lambda: pd.read_csv(config.get_path('trade_extracted')),
+    'daily_prices': _load_daily_prices_raw,
+    'price_by_country_year': lambda: pd.read_csv(config.get_path('price_by_country_year')),
+    'fact_table': lambda: pd.read_csv(os.path.join(config.get_path('star_schema_dir'), 'fact_table.csv')),
+}
+
+
+def main(datasets: list = None, max_violation_rate: float = None, report_dir: str = None) -> bool:
+    """
+    Validates the current files of the given datasets (default: all) and writes their reports.
+
+    Args:
+        datasets (list): Names from DATASET_LOADERS.
+        max_violation_rate (float): See validate().
+        report_dir (str): Defaults to the configured 'quality_report_dir' path.
+
+    Returns:
+        bool: True if every dataset passed.
+    """
+    report_dir = report_dir or config.get_path('quality_report_dir')
+    passed = True
+    for dataset in datasets or DATASET_LOADERS:
+        try:
+            validate(DATASET_LOADERS[dataset](), dataset, max_violation_rate=max_violation_rate,
+                     report_dir=report_dir)
+        except DataQualityError as e:
+            print(f"FAILED: {e}")
+            passed = False
+    return passed
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,47 @@
 import pandas as pd
 import os
 
-# Define the input and output filenames
-input_filename = '../datasets/price/raw/trade_data_raw.csv'
-output_filename = '../datasets/price/raw/trade_data_extracted.csv'
+import config
 
 # Define the columns to extract based on the names provided by the user.
 columns_to_extract_names = ['refYear', 'partnerDesc', 'fobvalue', 'netWgt','valuePerUnit']
 
-# Check if the output file already exists
-if os.path.exists(output_filename):
-    print(f"Output file '{output_filename}' already exists. Skipping data extraction.")
-else:
+
+def select_trade_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Selects the columns used by the price cleaning from the raw trade data.
+    """
+    return df[columns_to_extract_names]
+
+
+def read_trade_raw(input_filename: str) -> pd.DataFrame:
+    # Load the data, specifying the 'latin1' encoding to resolve potential UnicodeDecodeError.
+    # Round-trip parsing, so the extracted file read back gives the same floats as the raw file.
+    return pd.read_csv(input_filename, index_col=False, encoding='latin1', float_precision='round_trip')
+
+
+def extract_trade_data(input_filename: str = None, output_filename: str = None, overwrite: bool = False):
+    """
+    Extracts the relevant columns from the raw UN Comtrade export.
+
+    Args:
+        input_filename (str): The raw trade CSV. Defaults to the configured 'trade_raw' path.
+        output_filename (str): The extracted CSV. Defaults to the configured 'trade_extracted' path.
+        overwrite (bool): If False, an existing output file is left untouched.
+    """
+    input_filename = input_filename or config.get_path('trade_raw')
+    output_filename = output_filename or config.get_path('trade_extracted')
+
+    # Check if the output file already exists
+    if os.path.exists(output_filename) and not overwrite:
+        print(f"Output file '{output_filename}' already exists. Skipping data extraction.")
+        return
+
     try:
-        # Load the data, specifying the 'latin1' encoding to resolve potential UnicodeDecodeError.
-        df = pd.read_csv(input_filename, index_col=False, encoding='latin1')
+        df = read_trade_raw(input_filename)
 
         # Select the specified columns
-        df_extracted = df[columns_to_extract_names]
+        df_extracted = select_trade_columns(df)
 
         # Save the extracted data to a new CSV file
         df_extracted.to_csv(output_filename, index=False, encoding='utf-8')
@@ -27,4 +51,8 @@ else:
     except FileNotFoundError:
         print(f"Error: The input file '{input_filename}' was not found.")
     except KeyError as e:
-        print(f"Error: One or more specified columns were not found in the file: {e}")
\ No newline at end of file
+        print(f"Error: One or more specified columns were not found in the file: {e}")
+
+
+if __name__ == "__main__":
+    extract_trade_data()
@@ -0,0 +1,384 @@
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import aiohttp
+
+import config
+
+# --- Configuration ---
+# Every base URL can be overridden (e.g. with a local stub server) in the config file ("base_urls"),
+# with `cocoa_etl.py fetch --base-url SOURCE=URL`, or by passing `base_urls` to fetch_all().
+BASE_URLS = {
+    'climate': 'https://archive-api.open-meteo.com/v1/archive',
+    'trade': 'https://comtradeapi.un.org/public/v1/preview/C/A/HS',
+    'price': 'https://www.icco.org/statistics/daily-prices.csv',
+    'production': 'https://ourworldindata.org/grapher/cocoa-bean-production.csv',
+    'yields': 'https://ourworldindata.org/grapher/cocoa-bean-yields.csv',
+    'fx': 'https://api.frankfurter.app',
+}
+
+# Connection pool and retry settings
+MAX_CONNECTIONS = 20
+MAX_CONNECTIONS_PER_HOST = 8
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+REQUEST_TIMEOUT_SECONDS = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# The archives publish the last days of a year with a delay, so a year is only cached as
+# immutable once this many days have passed since 31 December
+IMMUTABLE_AFTER_DAYS = 14
+
+# Climate: the locations per country are config.CLIMATE_LOCATIONS
+CLIMATE_START_YEAR = 1980
+CLIMATE_DAILY_VARIABLES = ['temperature_2m_mean', 'rain_sum']
+CLIMATE_VALUE_FORMATS = {'temperature_2m_mean': '{:.1f}', 'rain_sum': '{:.2f}'}
+
+# Trade: HS 1801 (cocoa beans) imports from the producing countries (UN M49 partner codes)
+TRADE_COMMODITY_CODE = '1801'
+TRADE_FLOW_CODE = 'M'
+TRADE_PARTNER_CODES = {'BRA': 76, 'CIV': 384, 'GHA': 288, 'IDN': 360, 'NGA': 566}
+TRADE_START_YEAR = 1991
+TRADE_COLUMNS = ['refYear', 'partnerISO', 'partnerDesc', 'fobvalue', 'netWgt', 'qtyUnitAbbr', 'valuePerUnit']
+
+# FX: ECB reference rates (available from 1999) for the non-US$ price series
+FX_CURRENCIES = ['GBP', 'EUR']
+FX_START_YEAR = 1999
+
+PRICE_HEADER = ['Date', 'London futures (£ sterling/tonne)', 'New York futures (US$/tonne)',
+                'ICCO daily price (US$/tonne)', 'ICCO daily price (Euro/tonne)']
+
+
+# --- On-disk Response Cache ---
+
+class ResponseCache:
+    """
+    Stores HTTP response bodies on disk, keyed by the request URL and parameters.
+
+    Next to each body a small JSON file keeps the validators (ETag / Last-Modified) so
+    later requests can be made conditional. Entries marked immutable (e.g. a finished
+    year of climate history) are served from disk without contacting the server at all.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: dict = None) -> str:
+        canonical = url + '?' + '&'.join(f'{k}={v}' for k, v in sorted((params or {}).items()))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        return os.path.join(self.cache_dir, f'{key}.body'), os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key: str):
+        """Returns (metadata, body) for a cached response, or (None, None) if there is none."""
+        body_path, meta_path = self._paths(key)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None, None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return meta, body
+
+    def put(self, key: str, url: str, headers, body: bytes, immutable: bool = False):
+        body_path, meta_path = self._paths(key)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'immutable': immutable,
+            'fetched_at': time.time(),
+        }
+        # Write the body first so a metadata file never points at a missing body
+        with open(body_path, 'wb') as f:
+            f.write(body)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+
+def is_final_year(year: int, today: date) -> bool:
+    """
+    True once the data of `year` can no longer change (see IMMUTABLE_AFTER_DAYS).
+    """
+    return today > date(year, 12, 31) + timedelta(days=IMMUTABLE_AFTER_DAYS)
+
+
+# --- Core Fetch Function ---
+
+async def fetch(session: aiohttp.ClientSession, cache: ResponseCache, url: str, params: dict = None,
+                immutable: bool = False, cache_key: str = None) -> bytes:
+    """
+    Fetches a URL through the shared session, using the cache and retrying transient failures.
+
+    Args:
+        session (aiohttp.ClientSession): The pooled session shared by all requests.
+        cache (ResponseCache): The on-disk response cache.
+        url (str): The request URL (without query string).
+        params (dict): Query parameters.
+        immutable (bool): If True, a cached response is reused without revalidation.
+        cache_key (str): Cache key of the resource (default: derived from the url and params). A stable
+                         key lets a request whose parameters change daily (e.g. an end date of today)
+                         be revalidated instead of being stored again every day.
+
+    Returns:
+        bytes: The response body.
+    """
+    key = cache_key or cache.key(url, params)
+    meta, cached_body = cache.get(key)
+    if meta is not None and meta.get('immutable'):
+        return cached_body
+
+    headers = {}
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status == 304 and cached_body is not None:
+                    if immutable:
+                        # The cached copy is final now; later runs no longer need to revalidate it
+                        validators = {'ETag': meta.get('etag'), 'Last-Modified': meta.get('last_modified')}
+                        cache.put(key, meta['url'], validators, cached_body, immutable=True)
+                    return cached_body
+                if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    retry_after = response.headers.get('Retry-After')
+                    delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                    await _backoff(attempt, delay)
+                    continue
+                response.raise_for_status()
+                body = await response.read()
+                cache.put(key, str(response.url), response.headers, body, immutable=immutable)
+                return body
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+            await _backoff(attempt)
+
+    raise RuntimeError(f'Giving up on {url} after {MAX_RETRIES} retries.')
+
+
+async def _backoff(attempt: int, delay: float = None):
+    # Exponential backoff with jitter, unless the server told us how long to wait
+    if delay is None:
+        delay = BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random())
+    await asyncio.sleep(delay)
+
+
+# --- Source Fetchers ---
+
+async def fetch_climate(session, cache, country: str, base_url: str, end_date: date = None,
+                        output_dir: str = None) -> str:
+    """
+    Downloads daily climate history for one country from the Open-Meteo archive API and writes
+    it in the raw format read by clean_and_aggregate_climate.py.
+
+    The range is requested one calendar year at a time so finished years are cached as
+    immutable (see is_final_year()) and only the open year is ever revalidated. Each year is
+    cached under its year and location, not its end date, so the open year stays one entry.
+    """
+    latitude, longitude = config.CLIMATE_LOCATIONS[country]
+    end_date = end_date or date.today()
+    output_dir = output_dir or config.get_path('climate_raw_dir')
+
+    requests = []
+    for year in range(CLIMATE_START_YEAR, end_date.year + 1):
+        params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'start_date': f'{year}-01-01',
+            'end_date': min(date(year, 12, 31), end_date).isoformat(),
+            'daily': ','.join(CLIMATE_DAILY_VARIABLES),
+            'timezone': 'GMT',
+        }
+        cache_key = cache.key(base_url, {'latitude': latitude, 'longitude': longitude, 'year': year,
+                                         'daily': params['daily']})
+        requests.append(fetch(session, cache, base_url, params, immutable=is_final_year(year, end_date),
+                              cache_key=cache_key))
+    chunks = [json.loads(body) for body in await asyncio.gather(*requests)]
+
+    output_file = os.path.join(output_dir, f'climate_data_{country}_raw.csv')
+    _write_climate_csv(chunks, output_file)
+    print(f"Climate data for '{country}' saved to: {output_file}")
+    return output_file
+
+
+def _write_climate_csv(chunks: list, output_file: str):
+    # Open-Meteo CSV layout: location metadata, a blank line, then the daily table
+    first = chunks[0]
+    units = first.get('daily_units', {})
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['latitude', 'longitude', 'elevation', 'utc_offset_seconds', 'timezone',
+                         'timezone_abbreviation'])
+        writer.writerow([first['latitude'], first['longitude'], first['elevation'], first['utc_offset_seconds'],
+                         first['timezone'], first['timezone_abbreviation']])
+        f.write('\n')
+        writer.writerow(['time'] + [f'{var} ({units.get(var, "")})' for var in CLIMATE_DAILY_VARIABLES])
+        for chunk in chunks:
+            daily = chunk['daily']
+            for i, day in enumerate(daily['time']):
+                row = [day]
+                for var in CLIMATE_DAILY_VARIABLES:
+                    value = daily[var][i]
+                    row.append('' if value is None else CLIMATE_VALUE_FORMATS[var].format(value))
+                writer.writerow(row)
+
+
+async def fetch_trade(session, cache, base_url: str, end_year: int = None, output_file: str = None) -> str:
+    """
+    Downloads yearly cocoa bean import records from the UN Comtrade preview API and writes them
+    in the layout of trade_data_raw.csv (read by extract_trade_data.py).
+    """
+    end_year = end_year or date.today().year - 1
+    output_file = output_file or config.get_path('trade_raw')
+    partner_codes = ','.join(str(code) for code in TRADE_PARTNER_CODES.values())
+
+    requests = []
+    for year in range(TRADE_START_YEAR, end_year + 1):
+        params = {
+            'cmdCode': TRADE_COMMODITY_CODE,
+            'flowCode': TRADE_FLOW_CODE,
+            'partnerCode': partner_codes,
+            'period': year,
+            # Without it the API leaves partnerISO/partnerDesc empty
+            'includeDesc': 'true',
+        }
+        requests.append(fetch(session, cache, base_url, params))
+    responses = await asyncio.gather(*requests)
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(TRADE_COLUMNS)
+        for body in responses:
+            for record in json.loads(body).get('data', []):
+                fob_value, net_weight = record.get('fobvalue'), record.get('netWgt')
+                value_per_unit = fob_value / net_weight if fob_value and net_weight else ''
+                writer.writerow([record.get('refYear'), record.get('partnerISO'), record.get('partnerDesc'),
+                                 fob_value, net_weight, record.get('qtyUnitAbbr'), value_per_unit])
+
+    print(f"Trade data saved to: {output_file}")
+    return output_file
+
+
+async def fetch_fx_rates(session, cache, base_url: str, end_date: date = None, output_file: str = None) -> str:
+    """
+    Downloads daily US$ exchange rates for FX_CURRENCIES and writes the local FX-rate table
+    (columns: Date, currency, usd_per_unit) used by combine_price_sources.py.
+
+    Like the climate history, the range is requested per calendar year so finished years are
+    cached as immutable. The current year is requested open-ended ('YYYY-01-01..'), so its URL
+    stays the same from day to day and the cached copy is revalidated.
+    """
+    end_date = end_date or date.today()
+    output_file = output_file or config.get_path('fx_rates')
+
+    requests, currencies = [], []
+    for currency in FX_CURRENCIES:
+        for year in range(FX_START_YEAR, end_date.year + 1):
+            last_day = date(year, 12, 31).isoformat() if year < end_date.year else ''
+            url = f'{base_url}/{year}-01-01..{last_day}'
+            cache_key = cache.key(base_url, {'from': currency, 'to': 'USD', 'year': year})
+            requests.append(fetch(session, cache, url, {'from': currency, 'to': 'USD'},
+                                  immutable=is_final_year(year, end_date), cache_key=cache_key))
+            currencies.append(currency)
+    responses = await asyncio.gather(*requests)
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Date', 'currency', 'usd_per_unit'])
+        for currency, body in zip(currencies, responses):
+            for day, rates in sorted(json.loads(body).get('rates', {}).items()):
+                writer.writerow([day, currency, rates['USD']])
+
+    print(f"FX rates saved to: {output_file}")
+    return output_file
+
+
+async def fetch_csv(session, cache, base_url: str, output_file: str, expected_header: list = None) -> str:
+    """
+    Downloads a source that is already published in our raw CSV layout (ICCO daily prices,
+    FAO production and yields via Our World in Data) and writes it unchanged.
+    """
+    body = await fetch(session, cache, base_url)
+
+    if expected_header is not None:
+        header = next(csv.reader(io.StringIO(body.decode('utf-8-sig'))))
+        if header != expected_header:
+            raise ValueError(f"Unexpected header from {base_url}: {header}")
+
+    with open(output_file, 'wb') as f:
+        f.write(body)
+
+    print(f"Data from {base_url} saved to: {output_file}")
+    return output_file
+
+
+# --- Main Execution ---
+
+async def fetch_all(sources: list, base_urls: dict = None, cache_dir: str = None, countries: list = None) -> list:
+    """
+    Runs the requested source fetchers concurrently over one pooled HTTP session.
+
+    Args:
+        sources (list): Any of config.FETCH_SOURCES.
+        base_urls (dict): Overrides for BASE_URLS (e.g. a local stub server).
+        cache_dir (str): Directory of the on-disk response cache.
+        countries (list): Climate countries to fetch; defaults to all of config.CLIMATE_LOCATIONS.
+
+    Returns:
+        list: The paths of the written raw files.
+    """
+    urls = {**BASE_URLS, **config.get_base_urls(), **(base_urls or {})}
+    cache = ResponseCache(cache_dir or config.get_path('http_cache_dir'))
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        jobs = []
+        if 'climate' in sources:
+            for country in countries or config.CLIMATE_LOCATIONS:
+                jobs.append(fetch_climate(session, cache, country, base_url=urls['climate']))
+        if 'trade' in sources:
+            jobs.append(fetch_trade(session, cache, base_url=urls['trade']))
+        if 'price' in sources:
+            jobs.append(fetch_csv(session, cache, urls['price'], config.get_path('daily_price_raw'),
+                                  expected_header=PRICE_HEADER))
+        if 'production' in sources:
+            jobs.append(fetch_csv(session, cache, urls['production'], config.get_path('production_raw')))
+            jobs.append(fetch_csv(session, cache, urls['yields'], config.get_path('yields_raw')))
+        if 'fx' in sources:
+            jobs.append(fetch_fx_rates(session, cache, base_url=urls['fx']))
+        return await asyncio.gather(*jobs)
+
+
+def main(sources: list = None, countries: list = None, base_urls: dict = None):
+    """
+    Main function to refresh the raw datasets from their online sources.
+
+    Args:
+        sources (list): Any of config.FETCH_SOURCES (default: all).
+        countries (list): Climate countries to fetch (default: all of config.CLIMATE_LOCATIONS).
+        base_urls (dict): Source -> base URL overrides, on top of the configured ones.
+    """
+    start = time.perf_counter()
+    written = asyncio.run(fetch_all(sources or config.FETCH_SOURCES, base_urls=base_urls, countries=countries))
+    print("\n--- Download Complete ---")
+    print(f"{len(written)} raw files written in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import csv
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# --- Configuration ---
+# ICCO exports list the newest day first, with dates as dd/mm/yyyy and thousands separators in prices
+DATE_FORMAT = '%d/%m/%Y'
+PRICE_COLUMNS = ['London futures (£ sterling/tonne)', 'New York futures (US$/tonne)',
+                 'ICCO daily price (US$/tonne)', 'ICCO daily price (Euro/tonne)']
+SOURCE_COLUMN = 'source'
+# The last days of a snapshot may be incomplete (e.g. today's row before all markets closed), so this
+# many days before the end of the merged series are read again from every newer snapshot
+OVERLAP_DAYS = 7
+
+
+def read_latest_date(snapshot_file: str):
+    """
+    Returns the newest date of a newest-first snapshot by reading only its first data row.
+    """
+    with open(snapshot_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            if row and row[0]:
+                return datetime.strptime(row[0], DATE_FORMAT)
+    return None
+
+
+def read_snapshot(snapshot_file: str, since: datetime = None) -> pd.DataFrame:
+    """
+    Parses a newest-first daily price snapshot, stopping at the first day before `since`.
+
+    Args:
+        snapshot_file (str): The snapshot CSV (raw ICCO export layout).
+        since (datetime): Oldest date to read. Older rows are already covered by the merged
+                          series, so reading stops there. None parses the whole file.
+
+    Returns:
+        pd.DataFrame: The rows read, with parsed dates and prices, tagged with the snapshot name.
+    """
+    rows = []
+    with open(snapshot_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        for row in reader:
+            # Skip the empty rows at the end of the export
+            if not row or not row[0]:
+                continue
+            if since is not None and datetime.strptime(row[0], DATE_FORMAT) < since:
+                break
+            rows.append(row)
+
+    df = pd.DataFrame(rows, columns=header)[['Date'] + PRICE_COLUMNS]
+    df['Date'] = pd.to_datetime(df['Date'], format=DATE_FORMAT)
+    for column in PRICE_COLUMNS:
+        df[column] = df[column].str.replace(',', '', regex=False).replace('', np.nan).astype(float)
+    df[SOURCE_COLUMN] = os.path.basename(snapshot_file)
+
+    return df
+
+
+def deduplicate(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sorts the series by date and keeps one row per date: the one with the most prices, and of
+    equally complete rows the one from the newest snapshot.
+
+    Rows are expected in snapshot order (older snapshots first), so after a stable sort on the
+    date and the number of prices the last row of each date is the one to keep.
+    """
+    filled = df[PRICE_COLUMNS].notna().sum(axis=1)
+    order = np.lexsort((filled.to_numpy(), df['Date'].to_numpy()))
+    df = df.iloc[order]
+    df = df[~df['Date'].duplicated(keep='last')]
+    return df.reset_index(drop=True)
+
+
+def merge_snapshots(snapshot_files: list, merged_df: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Merges overlapping daily price snapshots into one deduplicated, date-sorted series.
+
+    Snapshots are applied from the oldest to the newest (by their newest date). Of each snapshot
+    only the days after the end of the series built so far, plus an overlap window of
+    OVERLAP_DAYS, are parsed. The rows of the window replace the merged ones if they are more
+    complete or equally complete (newer data), so a partial last day is fixed by the next drop
+    while a new drop still costs only its newest part instead of a full re-ingest.
+
+    Args:
+        snapshot_files (list): Paths of the snapshot CSVs, in any order.
+        merged_df (pd.DataFrame): An existing merged series to extend, or None to start empty.
+
+    Returns:
+        pd.DataFrame: Columns 'Date', the PRICE_COLUMNS and 'source' (the snapshot each row came from).
+    """
+    latest_dates = {path: read_latest_date(path) for path in snapshot_files}
+    ordered = sorted((path for path in snapshot_files if latest_dates[path] is not None), key=latest_dates.get)
+
+    parts = [] if merged_df is None else [merged_df]
+    series_end = None if merged_df is None or merged_df.empty else merged_df['Date'].max()
+
+    for path in ordered:
+        since = None if series_end is None else series_end - timedelta(days=OVERLAP_DAYS)
+        if since is not None and latest_dates[path] < since:
+            print(f"{os.path.basename(path)}: no days after {since:%d/%m/%Y}, skipped.")
+            continue
+
+        new_rows = read_snapshot(path, since=since)
+        parts.append(new_rows)
+        new_days = len(new_rows) if series_end is None else int((new_rows['Date'] > series_end).sum())
+        series_end = new_rows['Date'].max() if series_end is None else max(series_end, new_rows['Date'].max())
+        print(f"{os.path.basename(path)}: read {len(new_rows)} days, {new_days} of them new.")
+
+    if not parts:
+        return pd.DataFrame(columns=['Date'] + PRICE_COLUMNS + [SOURCE_COLUMN])
+    return deduplicate(pd.concat(parts, ignore_index=True))
+
+
+def read_merged_series(merged_file: str) -> pd.DataFrame:
+    """
+    Reads a merged series written by main(), or returns None if it does not exist yet.
+    """
+    if not os.path.exists(merged_file):
+        return None
+    df = pd.read_csv(merged_file)
+    df['Date'] = pd.to_datetime(df['Date'], format=DATE_FORMAT)
+    return df
+
+
+def main(snapshot_files: list = None, merged_file: str = None, rebuild: bool = False):
+    """
+    Extends the merged daily price series with any new days from the snapshots.
+
+    Args:
+        snapshot_files (list): Defaults to the two ICCO snapshots in the repository.
+        merged_file (str): Defaults to the configured 'daily_price_merged' path.
+        rebuild (bool): If True, ignores the existing merged series and rebuilds it from scratch.
+    """
+    snapshot_files = snapshot_files or [config.get_path('cocoa_bean_prices_raw'), config.get_path('daily_price_raw')]
+    merged_file = merged_file or config.get_path('daily_price_merged')
+
+    merged_df = None if rebuild else read_merged_series(merged_file)
+    merged_df = merge_snapshots(snapshot_files, merged_df)
+
+    # Keep the ICCO date format, so the merged series can be read like a raw snapshot
+    merged_df.to_csv(merged_file, index=False, date_format=DATE_FORMAT)
+    print(f"Merged series of {len(merged_df)} days saved to: {merged_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from partitioned_store import load_fact_table
+
+# --- Configuration ---
+TARGET = 'Yield (kg/hectare)'
+PRICE_VARIABLE = 'Avg_Price_Per_Unit'
+# Yearly Min Rainfall is always 0 and Yearly Average Rainfall is Total / days, so both are left out
+CLIMATE_VARIABLES = [
+    'Yearly Average Temperature',
+    'Yearly Min Temperature',
+    'Yearly Max Temperature',
+    'Yearly Total Rainfall',
+    'Yearly Max Rainfall',
+]
+COUNTRY_COLUMN = 'Country'
+YEAR_COLUMN = 'date_id'
+# Aggregate row of dim_country; it has no climate data
+EXCLUDED_COUNTRIES = ['World']
+POOLED_LABEL = 'All countries'
+
+MAX_LAG = 3
+MAX_CLIMATE_VARIABLES = 2
+# Specs leaving fewer residual degrees of freedom are not fitted
+MIN_RESIDUAL_DF = 5
+
+OUTPUT_FILES = {
+    'coefficients': 'coefficients.csv',
+    'fits': 'fit_statistics.csv',
+    'timing': 'timing.csv',
+}
+
+
+def lag_name(variable: str, lag: int) -> str:
+    return variable if lag == 0 else f'{variable} (t-{lag})'
+
+
+def intercept_name(country: str) -> str:
+    return f'Intercept[{country}]'
+
+
+def build_panel(fact_df: pd.DataFrame, max_lag: int = MAX_LAG) -> pd.DataFrame:
+    """
+    Returns one row per country and year with the target, the price and every climate
+    variable at lags 0..max_lag, plus one intercept (dummy) column per country.
+
+    Lags are matched on the year, not the row position, so gaps in a country's years give
+    missing lags instead of wrong ones.
+    """
+    panel = fact_df[~fact_df[COUNTRY_COLUMN].isin(EXCLUDED_COUNTRIES)]
+    panel = panel[[COUNTRY_COLUMN, YEAR_COLUMN, TARGET, PRICE_VARIABLE] + CLIMATE_VARIABLES]
+    panel = panel.sort_values([COUNTRY_COLUMN, YEAR_COLUMN]).reset_index(drop=True)
+
+    for lag in range(1, max_lag + 1):
+        lagged = panel[[COUNTRY_COLUMN, YEAR_COLUMN] + CLIMATE_VARIABLES].copy()
+        lagged[YEAR_COLUMN] += lag
+        lagged = lagged.rename(columns={v: lag_name(v, lag) for v in CLIMATE_VARIABLES})
+        panel = panel.merge(lagged, on=[COUNTRY_COLUMN, YEAR_COLUMN], how='left')
+
+    dummies = pd.get_dummies(panel[COUNTRY_COLUMN], dtype=float)
+    panel[[intercept_name(c) for c in dummies.columns]] = dummies.to_numpy()
+    return panel
+
+
+def build_specs(countries: list, max_lag: int = MAX_LAG, max_variables: int = MAX_CLIMATE_VARIABLES) -> list:
+    """
+    Enumerates the specifications: every group (each country and all countries pooled) x every
+    combination of up to `max_variables` climate variables x distributed lags 0..L for
+    L = 0..max_lag x with/without the price.
+
+    Pooled specs get one intercept per country (country fixed effects).
+
+    Returns:
+        list: Dicts with 'group', 'variables', 'max_lag', 'price' and the design 'terms'.
+    """
+    groups = [(POOLED_LABEL, countries)] + [(country, [country]) for country in countries]
+    variable_sets = [combo for size in range(1, max_variables + 1)
+                     for combo in itertools.combinations(CLIMATE_VARIABLES, size)]
+
+    specs = []
+    for (group, group_countries), variables, lag, price in itertools.product(
+            groups, variable_sets, range(max_lag + 1), [False, True]):
+        terms = [intercept_name(c) for c in group_countries]
+        terms += [lag_name(v, k) for v in variables for k in range(lag + 1)]
+        terms += [PRICE_VARIABLE] if price else []
+        specs.append({'group': group, 'countries': group_countries, 'variables': variables,
+                      'max_lag': lag, 'price': price, 'terms': terms})
+    return specs
+
+
+def fit_batch(panel: pd.DataFrame, specs: list) -> dict:
+    """
+    Fits all specs by ordinary least squares in one batched computation.
+
+    Every spec's design matrix is laid out on the full panel as a (rows x max_terms) slice of
+    one stacked array: rows outside the spec's sample and unused term slots are zero. A single
+    batched SVD then solves all problems at once; the zero padding only adds zero singular
+    values, which the pseudo-inverse ignores, so each spec gets its exact OLS solution.
+
+    Returns:
+        dict: 'coefficients', 'std_errors' (specs x max_terms), 'n', 'rank', 'ssr', 'tss' (per spec).
+    """
+    columns = list(panel.columns[2:])
+    matrix = panel[columns].to_numpy(dtype=float)
+    available = ~np.isnan(matrix)
+    # Extra all-zero column that the unused term slots of every spec point to
+    matrix = np.column_stack([np.nan_to_num(matrix), np.zeros(len(matrix))])
+    padding = len(columns)
+
+    max_terms = max(len(spec['terms']) for spec in specs)
+    term_index = np.full((len(specs), max_terms), padding)
+    for i, spec in enumerate(specs):
+        term_index[i, :len(spec['terms'])] = [columns.index(term) for term in spec['terms']]
+    used = term_index != padding
+
+    # Sample of each spec: rows of its countries with the target and all its terms present
+    target = columns.index(TARGET)
+    available = np.column_stack([available, np.ones(len(matrix), dtype=bool)])
+    in_group = np.array([panel[COUNTRY_COLUMN].isin(spec['countries']).to_numpy() for spec in specs])
+    rows = in_group & available[:, term_index].all(axis=2).T & available[:, target]
+
+    X = matrix[:, term_index].transpose(1, 0, 2) * rows[:, :, None]
+    y = matrix[:, target] * rows
+
+    U, s, Vt = np.linalg.svd(X, full_matrices=False)
+    tolerance = s.max(axis=1, keepdims=True) * max(X.shape[1:]) * np.finfo(float).eps
+    s_inv = np.where(s > tolerance, 1 / np.where(s > tolerance, s, 1), 0)
+
+    coefficients = np.einsum('sji,sj,snj,sn->si', Vt, s_inv, U, y)
+    residuals = y - np.einsum('sni,si->sn', X, coefficients)
+
+    n = rows.sum(axis=1)
+    rank = (s > tolerance).sum(axis=1)
+    ssr = (residuals ** 2).sum(axis=1)
+    y_mean = y.sum(axis=1) / np.maximum(n, 1)
+    tss = (((y - y_mean[:, None]) * rows) ** 2).sum(axis=1)
+
+    # Var(beta) = sigma^2 * (X'X)^+ = sigma^2 * V diag(1/s^2) V'
+    sigma2 = ssr / np.maximum(n - rank, 1)
+    std_errors = np.sqrt(sigma2[:, None] * np.einsum('sji,sj->si', Vt ** 2, s_inv ** 2))
+    std_errors[~used] = np.nan
+    coefficients[~used] = np.nan
+
+    return {'coefficients': coefficients, 'std_errors': std_errors, 'n': n, 'rank': rank, 'ssr': ssr, 'tss': tss}
+
+
+def run_regressions(fact_df: pd.DataFrame, max_lag: int = MAX_LAG,
+                    max_variables: int = MAX_CLIMATE_VARIABLES) -> tuple:
+    """
+    Builds the panel and the specs from the fact table and fits them all.
+
+    Returns:
+        tuple: (coefficients DataFrame, fit statistics DataFrame, timing DataFrame)
+    """
+    timings = []
+    start = time.perf_counter()
+    panel = build_panel(fact_df, max_lag)
+    specs = build_specs(sorted(panel[COUNTRY_COLUMN].unique()), max_lag, max_variables)
+    timings.append(('build_design', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    fit = fit_batch(panel, specs)
+    timings.append(('solve', time.perf_counter() - start))
+
+    # The degrees of freedom use the rank, so a collinear term does not count as a parameter
+    n, rank = fit['n'], fit['rank']
+    n_terms = np.array([len(spec['terms']) for spec in specs])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = 1 - fit['ssr'] / fit['tss']
+        fits_df = pd.DataFrame({
+            'Spec ID': np.arange(len(specs)),
+            'Group': [spec['group'] for spec in specs],
+            'Climate Variables': [' + '.join(spec['variables']) for spec in specs],
+            'Max Lag': [spec['max_lag'] for spec in specs],
+            'Price': [spec['price'] for spec in specs],
+            'N': n,
+            'Parameters': n_terms,
+            'Rank': rank,
+            'R-squared': r_squared,
+            'Adj. R-squared': 1 - (1 - r_squared) * (n - 1) / (n - rank),
+            'Residual SE': np.sqrt(fit['ssr'] / (n - rank)),
+            'AIC': n * np.log(fit['ssr'] / n) + 2 * rank,
+            'Rank Deficient': rank < n_terms,
+        })
+
+    # Specs with too few observations for their number of terms are reported as skipped
+    fitted = (n - rank) >= MIN_RESIDUAL_DF
+    if not fitted.all():
+        print(f"Skipped {(~fitted).sum()} of {len(specs)} specs with fewer than "
+              f"{MIN_RESIDUAL_DF} residual degrees of freedom.")
+    fits_df = fits_df[fitted].reset_index(drop=True)
+
+    spec_ids = np.repeat(np.arange(len(specs)), n_terms)
+    slots = np.concatenate([np.arange(k) for k in n_terms])
+    coefficients_df = pd.DataFrame({
+        'Spec ID': spec_ids,
+        'Term': [term for spec in specs for term in spec['terms']],
+        'Coefficient': fit['coefficients'][spec_ids, slots],
+        'Std. Error': fit['std_errors'][spec_ids, slots],
+    })
+    coefficients_df['t Value'] = coefficients_df['Coefficient'] / coefficients_df['Std. Error']
+    coefficients_df = coefficients_df[fitted[spec_ids]].reset_index(drop=True)
+
+    timing_df = pd.DataFrame(timings, columns=['Step', 'Seconds'])
+    timing_df['Specs'] = len(specs)
+    return coefficients_df, fits_df, timing_df
+
+
+def main(star_schema_dir: str = None, output_dir: str = None, max_lag: int = MAX_LAG,
+         max_variables: int = MAX_CLIMATE_VARIABLES):
+    """
+    Fits the regression specs on the star schema fact table and saves the coefficients,
+    fit statistics and timing.
+
+    Args:
+        star_schema_dir (str): Defaults to the configured 'star_schema_dir' path.
+        output_dir (str): Defaults to the configured 'regression_dir' path.
+        max_lag (int): Largest number of lagged years of the climate variables.
+        max_variables (int): Largest number of climate variables in one spec.
+    """
+    star_schema_dir = star_schema_dir or config.get_path('star_schema_dir')
+    output_dir = output_dir or config.get_path('regression_dir')
+
+    fact_df = load_fact_table(star_schema_dir)
+    coefficients_df, fits_df, timing_df = run_regressions(fact_df, max_lag, max_variables)
+    print(f"--- Fitted {len(fits_df)} specs in {timing_df['Seconds'].sum():.3f}s ---")
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, df in zip(['coefficients', 'fits', 'timing'], [coefficients_df, fits_df, timing_df]):
+        df.to_csv(os.path.join(output_dir, OUTPUT_FILES[name]), index=False)
+    print(f"Regression results saved to: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import glob
+import os
+import shutil
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+import config
+
+# --- Configuration ---
+# Warehouse tables are stored Hive-style: <warehouse_dir>/<table>/country=<name>/year=<yyyy>/part-0.csv
+PARTITION_KEYS = ['country', 'year']
+PART_FILE_NAME = 'part-0.csv'
+
+# Country names used as partition values (the names of dim_country)
+CLIMATE_COUNTRY_NAMES = {
+    'brazil': 'Brazil',
+    'ghana': 'Ghana',
+    'indonesia': 'Indonesia',
+    'ivory_coast': "Cote d'Ivoire",
+    'negeria': 'Nigeria',
+}
+
+
+def partition_dir(root: str, values: dict) -> str:
+    """
+    Returns the directory of one partition, e.g. root/country=Ghana/year=1997.
+    Values are URL-quoted so names like "Cote d'Ivoire" are safe as directory names.
+    """
+    parts = [f'{key}={quote(str(values[key]), safe="")}' for key in PARTITION_KEYS]
+    return os.path.join(root, *parts)
+
+
+def write_partitioned(df: pd.DataFrame, root: str, country_col: str, year_col: str, overwrite: bool = True):
+    """
+    Writes a table partitioned by country and year.
+
+    The partition columns stay in the files as well, so every partition file is a complete
+    slice of the table.
+
+    Args:
+        df (pd.DataFrame): The table to write.
+        root (str): Directory of the partitioned table.
+        country_col (str): Column holding the country name.
+        year_col (str): Column holding the year.
+        overwrite (bool): If True, removes the existing table first. Otherwise only the
+                          partitions present in `df` are replaced.
+
+    Raises:
+        ValueError: If a row has no country or year, e.g. a fact row whose country_id is not in
+                    dim_country. Such rows would otherwise be left out of every partition.
+    """
+    missing = df[[country_col, year_col]].isna().any(axis=1)
+    if missing.any():
+        raise ValueError(f"{missing.sum()} rows have no {country_col}/{year_col} value and cannot be partitioned.")
+
+    if overwrite and os.path.exists(root):
+        shutil.rmtree(root)
+
+    for (country, year), part in df.groupby([country_col, year_col], sort=True):
+        directory = partition_dir(root, {'country': country, 'year': int(year)})
+        os.makedirs(directory, exist_ok=True)
+        part.to_csv(os.path.join(directory, PART_FILE_NAME), index=False)
+
+    print(f"Saved {df.groupby([country_col, year_col]).ngroups} partitions to: {root}")
+
+
+def list_partitions(root: str, countries: list = None, years=None) -> list:
+    """
+    Returns the partition files matching the filters, looking only at directory names.
+
+    The country level is filtered before the year directories are listed, so non-matching
+    countries are never even listed, let alone opened.
+
+    Args:
+        root (str): Directory of the partitioned table.
+        countries (list): Country names to keep (None keeps all).
+        years: Collection of years to keep, e.g. range(2000, 2011) (None keeps all).
+    """
+    countries = None if countries is None else set(countries)
+    years = None if years is None else set(int(year) for year in years)
+
+    files = []
+    for country_dir in sorted(glob.glob(os.path.join(root, 'country=*'))):
+        country = unquote(os.path.basename(country_dir).split('=', 1)[1])
+        if countries is not None and country not in countries:
+            continue
+        for year_dir in sorted(glob.glob(os.path.join(country_dir, 'year=*'))):
+            year = int(os.path.basename(year_dir).split('=', 1)[1])
+            if years is not None and year not in years:
+                continue
+            part_file = os.path.join(year_dir, PART_FILE_NAME)
+            if os.path.exists(part_file):
+                files.append(part_file)
+    return files
+
+
+def read_partitioned(root: str, countries: list = None, years=None) -> pd.DataFrame:
+    """
+    Reads a partitioned table, opening only the partitions that match the country/year filters.
+    """
+    files = list_partitions(root, countries=countries, years=years)
+    if not files:
+        return pd.DataFrame()
+    return pd.concat((pd.read_csv(path) for path in files), ignore_index=True)
+
+
+# --- Warehouse Tables ---
+
+def load_climate_table(climate_dir: str) -> pd.DataFrame:
+    """
+    Combines the per-country yearly climate files into one table with a 'Country' column.
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(climate_dir, 'yearly_climate_data_*_clean.csv'))):
+        key = os.path.basename(path).replace('yearly_climate_data_', '').replace('_clean.csv', '')
+        df = pd.read_csv(path)
+        df.insert(0, 'Country', CLIMATE_COUNTRY_NAMES.get(key, key))
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_fact_table(star_schema_dir: str) -> pd.DataFrame:
+    """
+    Reads the fact table with the country name from dim_country attached.
+    """
+    fact_df = pd.read_csv(os.path.join(star_schema_dir, 'fact_table.csv'))
+    dim_country = pd.read_csv(os.path.join(star_schema_dir, 'dim_country.csv'))
+    return fact_df.merge(dim_country, on='country_id', how='left')
+
+
+# Table name -> (loader, country column, year column)
+TABLES = {
+    'climate': (lambda: load_climate_table(config.get_path('climate_clean_dir')), 'Country', 'year'),
+    'price': (lambda: pd.read_csv(config.get_path('price_by_country_year')), 'partnerDesc', 'refYear'),
+    'fact_table': (lambda: load_fact_table(config.get_path('star_schema_dir')), 'Country', 'date_id'),
+}
+
+
+def main(tables: list = None, warehouse_dir: str = None):
+    """
+    Writes the partitioned copies of the warehouse tables.
+
+    Args:
+        tables (list): Names from TABLES (default: all).
+        warehouse_dir (str): Defaults to the configured 'warehouse_dir' path.
+    """
+    warehouse_dir = warehouse_dir or config.get_path('warehouse_dir')
+
+    for name in tables or TABLES:
+        loader, country_col, year_col = TABLES[name]
+        write_partitioned(loader(), os.path.join(warehouse_dir, name), country_col, year_col)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import os
+import time
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+import config
+import data_quality
+from clean_and_aggregate_climate import aggregate_all, save_yearly_files
+from clean_price import calculate_average_price, clean_trade_data_v2
+from combine_price_sources import (aggregate_prices, daily_price_source, load_daily_prices, load_fx_rates,
+                                   merge_icco_price, normalize_prices, price_column_new, sort_by_year)
+from backends import get_backend
+from extract_trade_data import read_trade_raw, select_trade_columns
+from price_volatility import (add_price_measures_to_fact_table, calculate_price_statistics, read_fact_table,
+                              save_fact_table)
+
+
+class Stage(NamedTuple):
+    """
+    One step of the in-memory pipeline: `func` is called with the frames named in `inputs`
+    and returns the frame(s) named in `outputs` (a tuple if there is more than one).
+
+    A stage that validates data itself sets `validates`; its `func` then also gets the run's
+    `max_violation_rate` and `report_dir` as keyword arguments.
+    """
+    name: str
+    func: Callable
+    inputs: list
+    outputs: list
+    validates: bool = False
+
+
+# --- Sources ---
+# Frames read from disk at the start of the pipeline; each is loaded only if a stage needs it.
+SOURCES = {
+    'trade_raw': lambda: read_trade_raw(config.get_path('trade_raw')),
+    'fx_rates': lambda: load_fx_rates(config.get_path('fx_rates')),
+    'fact_table_base': lambda: read_fact_table(os.path.join(config.get_path('star_schema_dir'), 'fact_table.csv')),
+    'merged_data_for_eda': lambda: pd.read_csv(config.get_path('merged_data_for_eda')),
+}
+
+# --- Stages ---
+STAGES = [
+    Stage('extract_trade', select_trade_columns, ['trade_raw'], ['trade_extracted']),
+    # No defensive copy: trade_extracted has no other consumer
+    Stage('clean_trade', lambda df, **quality: clean_trade_data_v2(df, remove_outliers=True, **quality),
+          ['trade_extracted'], ['trade_clean'], validates=True),
+    Stage('average_price', calculate_average_price, ['trade_clean'], ['price_by_country']),
+    Stage('load_daily_prices', lambda **quality: load_daily_prices(daily_price_source(), **quality), [],
+          ['daily_price_series'], validates=True),
+    Stage('normalize_prices', normalize_prices, ['daily_price_series', 'fx_rates'], ['daily_prices_usd']),
+    Stage('aggregate_prices', aggregate_prices, ['daily_prices_usd'],
+          ['price_series_by_month', 'price_series_by_year']),
+    Stage('combine_price', lambda df, annual: sort_by_year(merge_icco_price(df, annual[[price_column_new]])),
+          ['price_by_country', 'price_series_by_year'], ['price_by_country_year']),
+    Stage('price_statistics', calculate_price_statistics, ['daily_price_series'], ['price_statistics_by_year']),
+    Stage('fact_table', add_price_measures_to_fact_table, ['fact_table_base', 'price_statistics_by_year'],
+          ['fact_table']),
+    Stage('aggregate_climate', lambda: aggregate_all(config.get_path('climate_raw_dir')), [], ['climate_yearly']),
+]
+
+
+def build_stages(backend: str = 'pandas') -> list:
+    """
+    Returns the pipeline stages for a DataFrame backend (see backends.BACKENDS).
+
+    With 'pandas' these are the STAGES. Any other backend replaces the trade, price and climate
+    stages by one fused stage each, which reads the raw file and aggregates it in a single plan.
+    The fused price stage also hands its validated daily prices to the price statistics, so the
+    daily file is read only once.
+    """
+    if backend == 'pandas':
+        return list(STAGES)
+
+    engine = get_backend(backend)
+    fused = {
+        'average_price': Stage('average_price',
+                               lambda **quality: engine.average_trade_price(config.get_path('trade_raw'), **quality),
+                               [], ['price_by_country'], validates=True),
+        'aggregate_prices': Stage('aggregate_prices',
+                                  lambda **quality: engine.aggregate_prices(daily_price_source(),
+                                                                            config.get_path('fx_rates'), **quality),
+                                  [], ['daily_price_series', 'price_series_by_month', 'price_series_by_year'],
+                                  validates=True),
+        'aggregate_climate': Stage('aggregate_climate',
+                                   lambda: engine.aggregate_climate(config.get_path('climate_raw_dir')),
+                                   [], ['climate_yearly']),
+    }
+    # The stages that only prepare the inputs of a fused stage are dropped
+    replaced = {'extract_trade', 'clean_trade', 'load_daily_prices', 'normalize_prices'}
+    return [fused.get(stage.name, stage) for stage in STAGES if stage.name not in replaced]
+
+
+def _plot_eda(df: pd.DataFrame):
+    # Imported here, so runs without plots never load matplotlib/seaborn
+    from merged_data_eda import plot_eda
+    plot_eda(df, config.get_path('eda_plot_dir'))
+
+
+# Stages that only produce charts; they run when the pipeline is started with plot=True
+PLOT_STAGES = [
+    Stage('eda', _plot_eda, ['merged_data_for_eda'], []),
+]
+
+
+# --- Checkpoints ---
+# Frame name -> function writing it to its configured location, as the individual scripts write it
+CHECKPOINT_WRITERS = {
+    'trade_extracted': lambda df: df.to_csv(config.get_path('trade_extracted'), index=False, encoding='utf-8'),
+    'price_by_country_year': lambda df: df.to_csv(config.get_path('price_by_country_year'), index=False),
+    'price_series_by_month': lambda df: df.to_csv(config.get_path('price_series_by_month'), date_format='%Y-%m'),
+    'price_series_by_year': lambda df: df.to_csv(config.get_path('price_series_by_year')),
+    'price_statistics_by_year': lambda df: df.to_csv(config.get_path('price_statistics_by_year'), index=False),
+    'fact_table': lambda df: save_fact_table(df, os.path.join(config.get_path('star_schema_dir'), 'fact_table.csv')),
+    'climate_yearly': lambda df: save_yearly_files(df, config.get_path('climate_clean_dir')),
+}
+
+# The files the individual scripts write today
+DEFAULT_CHECKPOINTS = ['price_by_country_year', 'price_series_by_month', 'price_series_by_year',
+                       'price_statistics_by_year', 'fact_table', 'climate_yearly']
+
+
+def run_pipeline(checkpoints: list = None, plot: bool = False, stages: list = None,
+                 max_violation_rate: float = None, report_dir: str = None) -> dict:
+    """
+    Runs the stages in one process, handing each stage's DataFrames directly to the next.
+
+    Sources are read from disk once, on first use. Intermediate frames stay in memory;
+    only frames listed in `checkpoints` are written to disk. Frames with a rule set in
+    data_quality.RULES are validated as soon as they are produced.
+
+    Args:
+        checkpoints (list): Frame names to write (default: DEFAULT_CHECKPOINTS).
+        plot (bool): If True, also runs the PLOT_STAGES.
+        stages (list): The stages to run, in order (default: STAGES).
+        max_violation_rate (float): Threshold of the data quality rules (see data_quality.validate()).
+        report_dir (str): Defaults to the configured 'quality_report_dir' path.
+
+    Returns:
+        dict: All frames by name.
+
+    Raises:
+        DataQualityError: If a frame breaks a data quality rule.
+    """
+    checkpoints = DEFAULT_CHECKPOINTS if checkpoints is None else checkpoints
+    unknown = set(checkpoints) - set(CHECKPOINT_WRITERS)
+    if unknown:
+        raise ValueError(f"No checkpoint writer for: {', '.join(sorted(unknown))}")
+
+    stages = list(stages or STAGES) + (PLOT_STAGES if plot else [])
+    quality = {'max_violation_rate': max_violation_rate,
+               'report_dir': report_dir or config.get_path('quality_report_dir')}
+    frames = {}
+
+    for stage in stages:
+        for name in stage.inputs:
+            if name not in frames:
+                if name not in SOURCES:
+                    raise KeyError(f"Stage '{stage.name}' needs '{name}', which no earlier stage or source provides.")
+                frames[name] = SOURCES[name]()
+
+        start = time.perf_counter()
+        result = stage.func(*(frames[name] for name in stage.inputs), **(quality if stage.validates else {}))
+        results = result if len(stage.outputs) > 1 else (result,)
+
+        for name, df in zip(stage.outputs, results):
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(f"Stage '{stage.name}' returned {type(df).__name__} for '{name}', expected a DataFrame.")
+            # Outputs with a rule set are validated before any later stage or checkpoint sees them
+            if name in data_quality.RULES:
+                df = data_quality.validate(df, name, **quality)
+            frames[name] = df
+            if name in checkpoints:
+                CHECKPOINT_WRITERS[name](df)
+                print(f"Checkpoint written: {name}")
+
+        print(f"--- Stage '{stage.name}' finished in {time.perf_counter() - start:.2f}s ---")
+
+    return frames
+
+
+if __name__ == "__main__":
+    run_pipeline()
@@ -0,0 +1,156 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+import config
+from combine_price_sources import daily_price_source, load_daily_prices
+from data_quality import validate
+
+# --- Configuration ---
+PRICE_COLUMN = 'ICCO daily price (US$/tonne)'
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+TRADING_DAYS_PER_YEAR = 252
+
+# Measures added to the fact table (ICCO world market price in US$/kg, the same for every country in a year)
+MEASURE_COLUMNS = [
+    'Yearly Price Volatility',
+    'Yearly Annualized Price Volatility',
+    'Yearly Min Price',
+    'Yearly Max Price',
+    'Yearly Open Price',
+    'Yearly Close Price',
+] + [f'Yearly Price P{int(q * 100):02d}' for q in QUANTILES]
+
+
+def calculate_price_statistics(daily_df: pd.DataFrame, column: str = PRICE_COLUMN) -> pd.DataFrame:
+    """
+    Calculates per-year distribution statistics of a daily price series.
+
+    The series is sorted by date once; the year boundaries in that sorted array are the only
+    grouping step. All statistics are then computed with vectorized NumPy over those boundaries:
+    the standard deviation of daily log returns (volatility), min/max, first/last price of the
+    year (open/close) and the QUANTILES.
+
+    Args:
+        daily_df (pd.DataFrame): Daily prices indexed by date (see load_daily_prices()).
+        column (str): The price column, in US$/tonne.
+
+    Returns:
+        pd.DataFrame: One row per year ('Year') with the MEASURE_COLUMNS, prices in US$/kg.
+    """
+    series = daily_df[column].dropna().sort_index()
+    series = series[~series.index.duplicated(keep='first')]
+
+    # Convert units: US$/tonne to US$/kg (divide by 1000)
+    prices = series.to_numpy() / 1000
+    years = series.index.year.to_numpy()
+
+    # Year boundaries in the sorted array: [starts[i], ends[i]) holds all days of year i
+    unique_years, starts = np.unique(years, return_index=True)
+    ends = np.append(starts[1:], len(prices))
+    counts = ends - starts
+
+    # Daily log returns; a return belongs to the year of the day it ends on
+    log_returns = np.empty_like(prices)
+    log_returns[0] = np.nan
+    log_returns[1:] = np.diff(np.log(prices))
+
+    valid = ~np.isnan(log_returns)
+    n_returns = np.add.reduceat(valid.astype(int), starts)
+    return_sums = np.add.reduceat(np.where(valid, log_returns, 0.0), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_returns = return_sums / n_returns
+        deviations = np.where(valid, log_returns - np.repeat(mean_returns, counts), 0.0)
+        volatility = np.sqrt(np.add.reduceat(deviations ** 2, starts) / (n_returns - 1))
+    volatility[n_returns < 2] = np.nan
+
+    stats = pd.DataFrame({
+        'Year': unique_years,
+        'Yearly Price Volatility': volatility,
+        'Yearly Annualized Price Volatility': volatility * np.sqrt(TRADING_DAYS_PER_YEAR),
+        'Yearly Min Price': np.minimum.reduceat(prices, starts),
+        'Yearly Max Price': np.maximum.reduceat(prices, starts),
+        'Yearly Open Price': prices[starts],
+        'Yearly Close Price': prices[ends - 1],
+    })
+
+    # Quantiles: sort the prices within each year (years stay in the same blocks), then
+    # interpolate linearly between the neighbouring order statistics, as np.quantile does
+    sorted_prices = prices[np.lexsort((prices, years))]
+    for q in QUANTILES:
+        position = starts + q * (counts - 1)
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        fraction = position - lower
+        stats[f'Yearly Price P{int(q * 100):02d}'] = (
+            sorted_prices[lower] + (sorted_prices[upper] - sorted_prices[lower]) * fraction
+        )
+
+    return stats
+
+
+def add_price_measures_to_fact_table(fact_df: pd.DataFrame, stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the yearly price statistics to the fact table as measures, joined on date_id.
+    Measures from an earlier run are replaced.
+    """
+    fact_df = fact_df.drop(columns=[c for c in MEASURE_COLUMNS if c in fact_df.columns])
+    merged = fact_df.merge(stats.rename(columns={'Year': 'date_id'}), on='date_id', how='left')
+    return merged
+
+
+def format_number(value: float) -> str:
+    # Whole numbers without a decimal part (0, 39), others in their shortest round-trip form
+    return str(int(value)) if value.is_integer() else repr(float(value))
+
+
+def read_fact_table(fact_file: str) -> pd.DataFrame:
+    """
+    Reads the fact table with round-trip float parsing, so saving it again keeps every value.
+    """
+    return pd.read_csv(fact_file, float_precision='round_trip')
+
+
+def save_fact_table(fact_df: pd.DataFrame, fact_file: str):
+    """
+    Writes the fact table in the layout of the star schema export: quoted header, unquoted
+    numbers, whole numbers without '.0' and empty missing values. A table read with
+    read_fact_table() is written back byte for byte.
+    """
+    with open(fact_file, 'w', newline='') as f:
+        csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n').writerow(fact_df.columns)
+        fact_df.to_csv(f, index=False, header=False, float_format=format_number)
+
+
+def main(daily_price_file: str = None, star_schema_dir: str = None, max_violation_rate: float = None,
+         report_dir: str = None):
+    """
+    Computes the yearly ICCO price statistics, saves them and adds them to the fact table.
+
+    Args:
+        daily_price_file (str): Defaults to daily_price_source().
+        star_schema_dir (str): Defaults to the configured 'star_schema_dir' path.
+        max_violation_rate (float): Threshold of the data quality rules (see data_quality.validate()).
+        report_dir (str): Defaults to the configured 'quality_report_dir' path.
+    """
+    daily_price_file = daily_price_file or daily_price_source()
+    star_schema_dir = star_schema_dir or config.get_path('star_schema_dir')
+    report_dir = report_dir or config.get_path('quality_report_dir')
+
+    daily_df = load_daily_prices(daily_price_file, max_violation_rate=max_violation_rate, report_dir=report_dir)
+    stats = calculate_price_statistics(daily_df)
+    stats.to_csv(config.get_path('price_statistics_by_year'), index=False)
+    print(f"Price statistics for {len(stats)} years saved to: {config.get_path('price_statistics_by_year')}")
+
+    fact_file = os.path.join(star_schema_dir, 'fact_table.csv')
+    fact_df = add_price_measures_to_fact_table(read_fact_table(fact_file), stats)
+    # Fails before the file is overwritten if the table breaks a data quality rule
+    validate(fact_df, 'fact_table', max_violation_rate=max_violation_rate, report_dir=report_dir)
+    save_fact_table(fact_df, fact_file)
+    print(f"Added {len(MEASURE_COLUMNS)} price measures to: {fact_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import config
+
+# --- Configuration ---
+# Layout of the store:
+#   <snapshot_dir>/objects/<first 2 hex chars>/<sha256>   file contents, stored once per distinct content
+#   <snapshot_dir>/versions/<stage>/<version>.json        manifest: files -> hashes, plus code and inputs
+# Versions of a stage are numbered 1, 2, ... in the order they were created; the number comes first in
+# the version id, so ids sort in creation order even when several versions are created in one second
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Stage name -> configured paths of its outputs, inputs and the scripts that produce it
+STAGES = {
+    'climate_clean': {
+        'outputs': ['climate_clean_dir'],
+        'inputs': ['climate_raw_dir'],
+        'code': ['clean_and_aggregate_climate.py'],
+    },
+    'price_clean': {
+        'outputs': ['price_by_country_year'],
+        'inputs': ['trade_extracted', 'daily_price_raw', 'daily_price_merged'],
+        'code': ['clean_price.py', 'combine_price_sources.py'],
+    },
+    'star_schema': {
+        'outputs': ['star_schema_dir'],
+        'inputs': ['climate_clean_dir', 'price_by_country_year', 'production_raw', 'yields_raw'],
+        'code': ['price_volatility.py'],
+    },
+    'warehouse': {
+        'outputs': ['warehouse_dir'],
+        'inputs': ['climate_clean_dir', 'price_by_country_year', 'star_schema_dir'],
+        'code': ['partitioned_store.py'],
+    },
+}
+
+
+def hash_file(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_files(path: str) -> dict:
+    """
+    Returns {relative path: absolute path} of a file, or of all files below a directory.
+    """
+    if os.path.isfile(path):
+        return {os.path.basename(path): path}
+    files = {}
+    for directory, _, names in os.walk(path):
+        for name in names:
+            full_path = os.path.join(directory, name)
+            files[os.path.relpath(full_path, path).replace(os.sep, '/')] = full_path
+    return files
+
+
+def hash_paths(paths: list) -> dict:
+    """
+    Returns {relative path: hash} for all files of the given files/directories.
+    Relative paths are prefixed with the name of the file/directory they were found in.
+    """
+    hashes = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        prefix = os.path.basename(os.path.normpath(path))
+        for relative_path, full_path in list_files(path).items():
+            key = relative_path if os.path.isfile(path) else f'{prefix}/{relative_path}'
+            hashes[key] = hash_file(full_path)
+    return hashes
+
+
+def git_commit() -> str:
+    """
+    Returns the current git commit of the project, or None outside a git checkout.
+    """
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=config.PROJECT_ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class SnapshotStore:
+    """
+    Content-addressed store of versioned stage outputs.
+
+    Every file is stored under the hash of its contents, so an unchanged file (or an unchanged
+    partition of a partitioned table) takes disk space only once, however many versions refer
+    to it. A version is a small JSON manifest listing the hashes of its files together with
+    the hashes of the code and inputs that produced it.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.versions_dir = os.path.join(store_dir, 'versions')
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store_object(self, path: str, digest: str):
+        target = self.object_path(digest)
+        if os.path.exists(target):
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Copy under a temporary name first so a crash never leaves a truncated object behind
+        shutil.copyfile(path, target + '.tmp')
+        os.replace(target + '.tmp', target)
+        return True
+
+    def create_version(self, stage: str, outputs: list, inputs: list = None, code: list = None) -> dict:
+        """
+        Records a new version of a stage's outputs.
+
+        Args:
+            stage (str): Name of the stage.
+            outputs (list): Output files/directories of the stage.
+            inputs (list): Input files/directories the outputs were produced from.
+            code (list): Script files that produced the outputs.
+
+        Returns:
+            dict: The manifest. If the outputs, inputs and code are unchanged since the latest
+                  version, no new version is created and the latest manifest is returned (also
+                  when only the git commit differs).
+        """
+        files = {}
+        new_objects = 0
+        for path in outputs:
+            prefix = os.path.basename(os.path.normpath(path))
+            for relative_path, full_path in list_files(path).items():
+                digest = hash_file(full_path)
+                key = relative_path if os.path.isfile(path) else f'{prefix}/{relative_path}'
+                files[key] = digest
+                new_objects += self._store_object(full_path, digest)
+
+        content = {
+            'files': files,
+            'inputs': hash_paths(inputs or []),
+            'code': hash_paths(code or []),
+        }
+        # The commit is recorded but not hashed: a commit that changes none of the hashed files
+        # (e.g. docs only) does not make the outputs a new version
+        content_hash = hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+        latest = self.latest_version(stage)
+        if latest is not None and latest['content_hash'] == content_hash:
+            print(f"{stage}: unchanged since version {latest['version']}.")
+            return latest
+
+        created_at = datetime.now(timezone.utc)
+        sequence = 1 if latest is None else latest['sequence'] + 1
+        manifest = {
+            'stage': stage,
+            'version': f"{sequence:06d}-{created_at:%Y%m%dT%H%M%SZ}-{content_hash[:8]}",
+            'sequence': sequence,
+            'created_at': created_at.strftime(TIMESTAMP_FORMAT),
+            'content_hash': content_hash,
+            'git_commit': git_commit(),
+            **content,
+        }
+        stage_dir = os.path.join(self.versions_dir, stage)
+        os.makedirs(stage_dir, exist_ok=True)
+        # Mode 'x': an existing manifest is never overwritten
+        with open(os.path.join(stage_dir, f"{manifest['version']}.json"), 'x', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        print(f"{stage}: created version {manifest['version']} "
+              f"({len(files)} files, {new_objects} new objects stored).")
+        return manifest
+
+    def list_versions(self, stage: str) -> list:
+        """
+        Returns the manifests of a stage, oldest first (by their sequence number).
+        """
+        stage_dir = os.path.join(self.versions_dir, stage)
+        if not os.path.isdir(stage_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(stage_dir)):
+            if name.endswith('.json'):
+                with open(os.path.join(stage_dir, name), 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda m: m['sequence'])
+
+    def latest_version(self, stage: str):
+        versions = self.list_versions(stage)
+        return versions[-1] if versions else None
+
+    def resolve_version(self, stage: str, version: str = None, as_of: str = None) -> dict:
+        """
+        Finds a version by its id, or the latest version created at or before `as_of`
+        (an ISO date/time, UTC if no time zone is given). Without either, returns the latest.
+        """
+        versions = self.list_versions(stage)
+        if version is not None:
+            versions = [m for m in versions if m['version'] == version]
+        elif as_of is not None:
+            as_of_time = datetime.fromisoformat(as_of)
+            if as_of_time.tzinfo is None:
+                as_of_time = as_of_time.replace(tzinfo=timezone.utc)
+            cutoff = as_of_time.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+            versions = [m for m in versions if m['created_at'] <= cutoff]
+
+        if not versions:
+            raise ValueError(f"No version of '{stage}' found (version={version}, as_of={as_of}).")
+        return versions[-1]
+
+    def read_bytes(self, manifest: dict, relative_path: str) -> bytes:
+        with open(self.object_path(manifest['files'][relative_path]), 'rb') as f:
+            return f.read()
+
+    def read_csv(self, stage: str, relative_path: str, version: str = None, as_of: str = None,
+                 **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Reads one CSV file of a stage as it was in the given version (time travel).
+        """
+        manifest = self.resolve_version(stage, version=version, as_of=as_of)
+        return pd.read_csv(io.BytesIO(self.read_bytes(manifest, relative_path)), **read_csv_kwargs)
+
+    def checkout(self, stage: str, target_dir: str, version: str = None, as_of: str = None) -> dict:
+        """
+        Restores all files of a version into `target_dir`.
+        """
+        manifest = self.resolve_version(stage, version=version, as_of=as_of)
+        for relative_path, digest in manifest['files'].items():
+            target = os.path.join(target_dir, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(self.object_path(digest), target)
+        print(f"Checked out {stage} version {manifest['version']} to: {target_dir}")
+        return manifest
+
+
+def read_star_schema(version: str = None, as_of: str = None, store_dir: str = None) -> dict:
+    """
+    Reads the star schema tables as they were in a stored version.
+
+    Returns:
+        dict: {'fact_table': ..., 'dim_country': ..., 'dim_date': ...} DataFrames.
+    """
+    store = SnapshotStore(store_dir or config.get_path('snapshot_dir'))
+    manifest = store.resolve_version('star_schema', version=version, as_of=as_of)
+    prefix = os.path.basename(config.get_path('star_schema_dir'))
+    return {
+        table: pd.read_csv(io.BytesIO(store.read_bytes(manifest, f'{prefix}/{table}.csv')))
+        for table in ['fact_table', 'dim_country', 'dim_date']
+    }
+
+
+def create_stage_version(stage: str, store_dir: str = None) -> dict:
+    """
+    Records a version of one of the STAGES, using the configured paths.
+    """
+    store = SnapshotStore(store_dir or config.get_path('snapshot_dir'))
+    spec = STAGES[stage]
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    return store.create_version(
+        stage,
+        outputs=[config.get_path(name) for name in spec['outputs']],
+        inputs=[config.get_path(name) for name in spec['inputs']],
+        code=[os.path.join(scripts_dir, script) for script in spec['code']],
+    )
+
+
+def main(stages: list = None):
+    """
+    Records a version of every stage (or of the given stages) whose outputs exist.
+    """
+    for stage in stages or STAGES:
+        outputs = [config.get_path(name) for name in STAGES[stage]['outputs']]
+        if not all(os.path.exists(path) for path in outputs):
+            print(f"{stage}: outputs not found, skipped.")
+            continue
+        create_stage_version(stage)
+
+
+if __name__ == "__main__":
+    main()
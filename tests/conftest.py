@@ -0,0 +1,27 @@
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+# The scripts import each other by module name, as when they are run from scripts/
+sys.path.insert(0, SCRIPTS_DIR)
+
+import config  # noqa: E402
+
+
+@pytest.fixture
+def project_root(tmp_path):
+    """
+    Points every configured path into an empty project root under tmp_path (with their
+    directories created), so tests never touch the real datasets.
+    """
+    for name, relative_path in config.DEFAULT_PATHS.items():
+        directory = relative_path if name.endswith('_dir') else os.path.dirname(relative_path)
+        os.makedirs(os.path.join(tmp_path, directory), exist_ok=True)
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'root': '.'}))
+    config.load_config(str(config_file))
+    yield tmp_path
+    config.load_config()
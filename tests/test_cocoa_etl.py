@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import pytest
+
+import cocoa_etl
+import config
+from conftest import SCRIPTS_DIR
+
+
+def test_fetch_choices_come_from_the_config(monkeypatch):
+    monkeypatch.setitem(config.CLIMATE_LOCATIONS, 'cameroon', (4.5, 12.0))
+    args = cocoa_etl.build_parser().parse_args(['fetch', '--sources', 'climate', '--countries', 'cameroon'])
+    assert args.countries == ['cameroon']
+
+
+def test_fetch_rejects_unknown_countries():
+    parser = cocoa_etl.build_parser()
+    assert parser.parse_args(['fetch', '--countries', 'ghana']).countries == ['ghana']
+    with pytest.raises(SystemExit):
+        parser.parse_args(['fetch', '--countries', 'atlantis'])
+
+
+def test_building_the_parser_does_not_import_aiohttp():
+    code = "import sys, cocoa_etl; cocoa_etl.build_parser(); print('aiohttp' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
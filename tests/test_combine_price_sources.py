@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import combine_price_sources
+import config
+
+
+def test_daily_prices_come_from_the_merged_series_when_it_exists(project_root):
+    assert combine_price_sources.daily_price_source() == config.get_path('daily_price_raw')
+
+    open(config.get_path('daily_price_merged'), 'w').close()
+
+    assert combine_price_sources.daily_price_source() == config.get_path('daily_price_merged')
+
+
+def daily_prices(days: list, prices: list) -> pd.DataFrame:
+    # The same price in every raw column: £, US$, US$ and € per tonne
+    return pd.DataFrame({column: prices for column in combine_price_sources.PRICE_SERIES},
+                        index=pd.DatetimeIndex(pd.to_datetime(days), name='Date'))
+
+
+def test_prices_are_converted_with_the_latest_known_fx_rate():
+    daily_df = daily_prices(['2024-01-30', '2024-01-31', '2024-02-01', '2024-02-05'], [1000.0, 2000.0, 3000.0, 4000.0])
+    # No rate before 31 January; 5 February (a Monday) uses the rate of Friday 2 February
+    fx_rates = pd.DataFrame({'GBP': [1.25, 1.5], 'EUR': [1.1, 1.2]},
+                            index=pd.DatetimeIndex(pd.to_datetime(['2024-01-31', '2024-02-02']), name='Date'))
+
+    usd_df = combine_price_sources.normalize_prices(daily_df, fx_rates)
+
+    np.testing.assert_allclose(usd_df['New York futures (US$/kg)'], [1.0, 2.0, 3.0, 4.0])
+    np.testing.assert_allclose(usd_df['ICCO daily price (US$/kg)'], [1.0, 2.0, 3.0, 4.0])
+    np.testing.assert_allclose(usd_df['London futures (US$/kg)'], [np.nan, 2.5, 3.75, 6.0])
+    np.testing.assert_allclose(usd_df['ICCO Euro price (US$/kg)'], [np.nan, 2.2, 3.3, 4.8])
+
+
+def test_without_fx_table_only_the_usd_series_are_filled(project_root):
+    daily_df = daily_prices(['2024-01-31', '2024-02-01'], [2000.0, 3000.0])
+
+    usd_df = combine_price_sources.normalize_prices(daily_df, combine_price_sources.load_fx_rates(
+        config.get_path('fx_rates')))
+
+    np.testing.assert_allclose(usd_df['ICCO daily price (US$/kg)'], [2.0, 3.0])
+    assert usd_df['London futures (US$/kg)'].isna().all()
+    assert usd_df['ICCO Euro price (US$/kg)'].isna().all()
+
+
+def test_annual_average_is_the_mean_over_all_trading_days():
+    # Three trading days in January and one in February: the mean of the monthly means would be 3.5
+    usd_df = daily_prices(['2023-12-29', '2024-01-02', '2024-01-03', '2024-01-31', '2024-02-01'],
+                          [9.0, 1.0, 2.0, 3.0, 5.0])
+    usd_df.iloc[2, 0] = np.nan
+
+    monthly_avg_df, annual_avg_df = combine_price_sources.aggregate_prices(usd_df)
+
+    icco = 'ICCO daily price (US$/tonne)'
+    assert list(monthly_avg_df.index) == list(pd.to_datetime(['2023-12-31', '2024-01-31', '2024-02-29']))
+    np.testing.assert_allclose(monthly_avg_df[icco], [9.0, 2.0, 5.0])
+    np.testing.assert_allclose(annual_avg_df[icco], [9.0, 11.0 / 4])
+    # Missing days are left out of both the sums and the counts
+    np.testing.assert_allclose(annual_avg_df.iloc[:, 0], [9.0, 3.0])
+    assert list(annual_avg_df.index) == [2023, 2024]
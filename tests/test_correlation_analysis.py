@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+import correlation_analysis
+
+VARIABLES = ['x', 'y', 'z']
+
+
+def test_intervals_contain_the_estimate():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=40)
+    df = pd.DataFrame({'Country': np.repeat(['A', 'B'], 20), 'x': x, 'y': x + rng.normal(size=40),
+                       'z': rng.normal(size=40)})
+
+    table = correlation_analysis.correlation_table(df, variables=VARIABLES, n_resamples=200)
+
+    assert list(table.columns) == correlation_analysis.TABLE_COLUMNS
+    assert list(table['Country'].unique()) == ['All countries', 'A', 'B']
+    assert ((table['CI Lower'] <= table['Correlation']) & (table['Correlation'] <= table['CI Upper'])).all()
+
+
+def test_all_groups_skipped_gives_an_empty_table():
+    df = pd.DataFrame({'Country': ['A', 'B'], 'x': [1.0, 2.0], 'y': [3.0, np.nan], 'z': [0.0, 1.0]})
+
+    table = correlation_analysis.correlation_table(df, variables=VARIABLES, n_resamples=10)
+
+    assert table.empty
+    assert list(table.columns) == correlation_analysis.TABLE_COLUMNS
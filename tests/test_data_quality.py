@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+import pytest
+
+import cocoa_etl
+import config
+import data_quality
+import pipeline
+from conftest import SCRIPTS_DIR
+
+DATASETS_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'datasets')
+
+
+def trade_frame(n_rows: int, n_unparseable: int) -> pd.DataFrame:
+    # Plausible trade records, the first `n_unparseable` with a valuePerUnit that is not a number
+    return pd.DataFrame({
+        'refYear': range(2000, 2000 + n_rows),
+        'partnerDesc': 'Ghana',
+        'fobvalue': 2000.0,
+        'netWgt': 1000.0,
+        'valuePerUnit': ['n/a'] * n_unparseable + ['2.0'] * (n_rows - n_unparseable),
+    })
+
+
+def write_trade_with_missing_values(share: float):
+    trade_df = pd.read_csv(os.path.join(DATASETS_DIR, 'price', 'raw', 'trade_data_extracted.csv'))
+    trade_df.loc[:int(len(trade_df) * share), 'valuePerUnit'] = None
+    trade_df.to_csv(config.get_path('trade_extracted'), index=False)
+
+
+def test_validate_writes_a_report_only_when_asked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    data_quality.validate(trade_frame(10, 0), 'trade')
+    assert list(tmp_path.iterdir()) == []
+
+    data_quality.validate(trade_frame(10, 0), 'trade', report_dir=str(tmp_path / 'quality'))
+    report = pd.read_csv(tmp_path / 'quality' / 'trade.csv')
+    assert list(report['Rule']) == [rule.name for rule in data_quality.RULES['trade']]
+    assert set(report['Status']) == {'ok'}
+
+
+def test_too_many_violations_fail_unless_the_rate_allows_them():
+    with pytest.raises(data_quality.DataQualityError, match='numeric_value_per_unit 20.0% > 5.0%'):
+        data_quality.validate(trade_frame(10, 2), 'trade')
+
+    validated = data_quality.validate(trade_frame(10, 2), 'trade', max_violation_rate=0.25)
+    assert len(validated) == 8
+
+
+def test_clean_price_exits_non_zero_on_bad_data(project_root, capsys):
+    write_trade_with_missing_values(0.2)
+    argv = ['--config', str(project_root / 'config.json'), 'clean-price']
+
+    with pytest.raises(SystemExit) as exit_info:
+        cocoa_etl.main(argv)
+    assert 'complete_record' in str(exit_info.value.code)
+    assert 'Data quality check failed' not in capsys.readouterr().out
+    assert not os.path.exists(config.get_path('price_by_country_year'))
+
+    cocoa_etl.main(argv + ['--max-violation-rate', '0.5'])
+    assert os.path.exists(config.get_path('price_by_country_year'))
+    assert os.path.exists(os.path.join(config.get_path('quality_report_dir'), 'trade.csv'))
+
+
+def test_pipeline_passes_the_rate_to_validating_stages(project_root):
+    clean_trade = next(stage for stage in pipeline.STAGES if stage.name == 'clean_trade')
+    stages = [pipeline.Stage('read_trade', lambda: trade_frame(10, 2), [], ['trade_extracted']), clean_trade]
+
+    with pytest.raises(data_quality.DataQualityError):
+        pipeline.run_pipeline(checkpoints=[], stages=stages)
+
+    frames = pipeline.run_pipeline(checkpoints=[], stages=stages, max_violation_rate=0.25)
+    assert len(frames['trade_clean']) == 8
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+from datetime import date
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import cocoa_etl
+import fetch_raw_data
+
+PRICE_CSV = ('"Date","London futures (£ sterling/tonne)","New York futures (US$/tonne)",'
+             '"ICCO daily price (US$/tonne)","ICCO daily price (Euro/tonne)"\n'
+             '"27/11/2025","3,932.33","5,141.00","5,095.78","4,398.17"\n').encode('utf-8')
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Local stand-in for the ICCO and Open-Meteo servers, answering conditional requests with
+    304 when the client's ETag is current. Runs on its own event loop in a background thread.
+    """
+    state = {'requests': [], 'not_modified': 0, 'fail_next': 0}
+
+    def respond(request, body: bytes, etag: str, content_type: str):
+        state['requests'].append((request.path, dict(request.query), request.headers.get('If-None-Match')))
+        if state['fail_next']:
+            state['fail_next'] -= 1
+            return web.Response(status=503)
+        if request.headers.get('If-None-Match') == etag:
+            state['not_modified'] += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, headers={'ETag': etag, 'Content-Type': content_type})
+
+    async def prices(request):
+        return respond(request, PRICE_CSV, '"prices-v1"', 'text/csv')
+
+    async def archive(request):
+        # The ETag only depends on the year, so a later end date of the open year counts as unchanged
+        year = request.query['start_date'][:4]
+        body = json.dumps({
+            'latitude': float(request.query['latitude']), 'longitude': float(request.query['longitude']),
+            'elevation': 100.0, 'utc_offset_seconds': 0, 'timezone': 'GMT', 'timezone_abbreviation': 'GMT',
+            'daily_units': {'time': 'iso8601', 'temperature_2m_mean': '°C', 'rain_sum': 'mm'},
+            'daily': {'time': [f'{year}-01-01'], 'temperature_2m_mean': [25.0], 'rain_sum': [1.5]},
+        }).encode('utf-8')
+        return respond(request, body, f'"archive-{year}"', 'application/json')
+
+    async def trade(request):
+        # Like the Comtrade preview API, the partner names are only filled in with includeDesc=true
+        described = request.query.get('includeDesc') == 'true'
+        year = int(request.query['period'])
+        body = json.dumps({'data': [
+            {'refYear': year, 'partnerISO': 'GHA' if described else None, 'partnerDesc': 'Ghana' if described else None,
+             'fobvalue': 3000.0, 'netWgt': 1500.0, 'qtyUnitAbbr': 'kg'},
+            {'refYear': year, 'partnerISO': 'BRA' if described else None, 'partnerDesc': 'Brazil' if described else None,
+             'fobvalue': 500.0, 'netWgt': None, 'qtyUnitAbbr': 'kg'},
+        ]}).encode('utf-8')
+        return respond(request, body, f'"trade-{year}-{described}"', 'application/json')
+
+    async def fx(request):
+        # Frankfurter time series: /<start>..<end>?from=GBP&to=USD, the end is left open for the current year
+        start, _, end = request.match_info['period'].partition('..')
+        first_rate, later_rate = {'GBP': (1.26, 1.25), 'EUR': (1.11, 1.1)}[request.query['from']]
+        body = json.dumps({'base': request.query['from'], 'start_date': start, 'end_date': end or start,
+                           'rates': {f'{start[:4]}-01-04': {'USD': later_rate}, start: {'USD': first_rate}}})
+        return respond(request, body.encode('utf-8'), f'"fx-{request.match_info["period"]}"', 'application/json')
+
+    app = web.Application()
+    app.router.add_get('/prices.csv', prices)
+    app.router.add_get('/archive', archive)
+    app.router.add_get('/trade', trade)
+    app.router.add_get('/fx/{period}', fx)
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    loop.run_until_complete(web.SockSite(runner, sock).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{sock.getsockname()[1]}', state
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+
+def fetch_climate_years(base_url: str, cache_dir: str, output_dir: str, end_date: date):
+    async def run():
+        cache = fetch_raw_data.ResponseCache(cache_dir)
+        async with aiohttp.ClientSession() as session:
+            return await fetch_raw_data.fetch_climate(session, cache, 'ghana', base_url, end_date=end_date,
+                                                      output_dir=output_dir)
+    return asyncio.run(run())
+
+
+def test_price_download_is_cached_and_revalidated(project_root, stub_server):
+    base_url, state = stub_server
+    price_url = f'{base_url}/prices.csv'
+
+    fetch_raw_data.main(sources=['price'], base_urls={'price': price_url})
+    fetch_raw_data.main(sources=['price'], base_urls={'price': price_url})
+
+    assert [etag for _, _, etag in state['requests']] == [None, '"prices-v1"']
+    assert state['not_modified'] == 1
+    with open(os.path.join(project_root, 'datasets/price/raw/daily_price_raw.csv'), 'rb') as f:
+        assert f.read() == PRICE_CSV
+
+
+def test_cli_base_url_override(project_root, stub_server):
+    base_url, state = stub_server
+
+    cocoa_etl.main(['--config', str(project_root / 'config.json'), 'fetch', '--sources', 'price',
+                    '--base-url', f'price={base_url}/prices.csv'])
+
+    assert [path for path, _, _ in state['requests']] == ['/prices.csv']
+    assert os.path.exists(os.path.join(project_root, 'datasets/price/raw/daily_price_raw.csv'))
+
+
+def test_transient_errors_are_retried(project_root, stub_server, monkeypatch):
+    base_url, state = stub_server
+    monkeypatch.setattr(fetch_raw_data, 'BACKOFF_SECONDS', 0)
+    state['fail_next'] = 2
+
+    fetch_raw_data.main(sources=['price'], base_urls={'price': f'{base_url}/prices.csv'})
+
+    assert len(state['requests']) == 3
+
+
+def test_finished_years_become_immutable_only_after_the_margin(tmp_path, stub_server, monkeypatch):
+    base_url, state = stub_server
+    monkeypatch.setattr(fetch_raw_data, 'CLIMATE_START_YEAR', 1980)
+    cache_dir, archive_url = str(tmp_path / 'cache'), f'{base_url}/archive'
+
+    def requested_years():
+        years = [query['start_date'][:4] for _, query, _ in state['requests']]
+        state['requests'].clear()
+        return years
+
+    # Early January: 1980 may still get late data, so it is revalidated like the open year
+    fetch_climate_years(archive_url, cache_dir, str(tmp_path), date(1981, 1, 5))
+    fetch_climate_years(archive_url, cache_dir, str(tmp_path), date(1981, 1, 6))
+    assert sorted(requested_years()) == ['1980', '1980', '1981', '1981']
+    assert state['not_modified'] == 2
+
+    # Past the margin the revalidated 1980 copy is kept for good and never requested again
+    fetch_climate_years(archive_url, cache_dir, str(tmp_path), date(1981, 2, 1))
+    fetch_climate_years(archive_url, cache_dir, str(tmp_path), date(1981, 2, 2))
+    assert sorted(requested_years()) == ['1980', '1981', '1981']
+
+
+def test_open_year_keeps_one_cache_entry(tmp_path, stub_server, monkeypatch):
+    base_url, state = stub_server
+    monkeypatch.setattr(fetch_raw_data, 'CLIMATE_START_YEAR', 1981)
+    cache_dir = tmp_path / 'cache'
+
+    for day in range(1, 6):
+        fetch_climate_years(f'{base_url}/archive', str(cache_dir), str(tmp_path), date(1981, 3, day))
+
+    assert len(list(cache_dir.glob('*.body'))) == 1
+    assert state['not_modified'] == 4
+    assert (tmp_path / 'climate_data_ghana_raw.csv').exists()
+
+
+def test_is_final_year():
+    assert not fetch_raw_data.is_final_year(2024, date(2025, 1, 2))
+    assert fetch_raw_data.is_final_year(2024, date(2025, 2, 1))
+    assert not fetch_raw_data.is_final_year(2025, date(2025, 6, 1))
+
+
+def test_trade_records_are_written_in_the_raw_layout(project_root, stub_server, monkeypatch):
+    base_url, state = stub_server
+    monkeypatch.setattr(fetch_raw_data, 'TRADE_START_YEAR', 2022)
+    output_file = project_root / 'trade_data_raw.csv'
+
+    async def run():
+        cache = fetch_raw_data.ResponseCache(str(project_root / 'cache'))
+        async with aiohttp.ClientSession() as session:
+            await fetch_raw_data.fetch_trade(session, cache, f'{base_url}/trade', end_year=2023,
+                                             output_file=str(output_file))
+    asyncio.run(run())
+
+    assert sorted(query['period'] for _, query, _ in state['requests']) == ['2022', '2023']
+    assert all(query['includeDesc'] == 'true' for _, query, _ in state['requests'])
+    assert output_file.read_text().splitlines() == [
+        'refYear,partnerISO,partnerDesc,fobvalue,netWgt,qtyUnitAbbr,valuePerUnit',
+        '2022,GHA,Ghana,3000.0,1500.0,kg,2.0',
+        '2022,BRA,Brazil,500.0,,kg,',
+        '2023,GHA,Ghana,3000.0,1500.0,kg,2.0',
+        '2023,BRA,Brazil,500.0,,kg,',
+    ]
+
+
+def test_fx_rates_are_written_per_currency_and_day(project_root, stub_server, monkeypatch):
+    base_url, state = stub_server
+    monkeypatch.setattr(fetch_raw_data, 'FX_START_YEAR', 2023)
+    output_file = project_root / 'fx_rates.csv'
+
+    async def run():
+        cache = fetch_raw_data.ResponseCache(str(project_root / 'cache'))
+        async with aiohttp.ClientSession() as session:
+            await fetch_raw_data.fetch_fx_rates(session, cache, f'{base_url}/fx', end_date=date(2024, 3, 1),
+                                                output_file=str(output_file))
+    asyncio.run(run())
+
+    # Finished years are requested with their last day, the current year open-ended
+    assert sorted(path for path, _, _ in state['requests']) == [
+        '/fx/2023-01-01..2023-12-31', '/fx/2023-01-01..2023-12-31', '/fx/2024-01-01..', '/fx/2024-01-01..']
+    assert output_file.read_text().splitlines() == [
+        'Date,currency,usd_per_unit',
+        '2023-01-01,GBP,1.26',
+        '2023-01-04,GBP,1.25',
+        '2024-01-01,GBP,1.26',
+        '2024-01-04,GBP,1.25',
+        '2023-01-01,EUR,1.11',
+        '2023-01-04,EUR,1.1',
+        '2024-01-01,EUR,1.11',
+        '2024-01-04,EUR,1.1',
+    ]
@@ -0,0 +1,62 @@
+import pandas as pd
+
+import merge_price_snapshots
+from merge_price_snapshots import PRICE_COLUMNS, SOURCE_COLUMN
+
+HEADER = ','.join(f'"{c}"' for c in ['Date'] + PRICE_COLUMNS)
+
+
+def write_snapshot(path, rows):
+    # rows: newest first, (date, London, New York, ICCO US$, ICCO Euro) with '' for missing prices
+    lines = [HEADER] + [','.join(f'"{value}"' for value in row) for row in rows] + ['"","","","",""']
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_newer_snapshot_completes_a_partial_last_day(tmp_path):
+    first = write_snapshot(tmp_path / 'first.csv', [
+        ('27/11/2025', '', '', '3,932.33', ''),
+        ('26/11/2025', '3,100.00', '5,000.00', '3,900.00', '3,400.00'),
+    ])
+    merged = merge_price_snapshots.merge_snapshots([first])
+
+    second = write_snapshot(tmp_path / 'second.csv', [
+        ('28/11/2025', '3,150.00', '5,100.00', '3,950.00', '3,420.00'),
+        ('27/11/2025', '3,120.00', '5,050.00', '3,932.33', '3,410.00'),
+        ('26/11/2025', '3,100.00', '5,000.00', '3,900.00', '3,400.00'),
+    ])
+    merged = merge_price_snapshots.merge_snapshots([second], merged)
+
+    assert list(merged['Date']) == list(pd.to_datetime(['2025-11-26', '2025-11-27', '2025-11-28']))
+    completed = merged[merged['Date'] == '2025-11-27'].iloc[0]
+    assert completed[PRICE_COLUMNS].notna().all()
+    assert completed[SOURCE_COLUMN] == 'second.csv'
+
+
+def test_less_complete_rows_do_not_replace_merged_ones(tmp_path):
+    first = write_snapshot(tmp_path / 'first.csv', [('27/11/2025', '3,120.00', '5,050.00', '3,932.33', '3,410.00')])
+    second = write_snapshot(tmp_path / 'second.csv', [
+        ('28/11/2025', '', '', '3,950.00', ''),
+        ('27/11/2025', '', '', '3,932.33', ''),
+    ])
+
+    merged = merge_price_snapshots.merge_snapshots([second, first])
+
+    assert list(merged[SOURCE_COLUMN]) == ['first.csv', 'second.csv']
+
+
+def test_days_before_the_overlap_window_are_not_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_price_snapshots, 'OVERLAP_DAYS', 2)
+    old = write_snapshot(tmp_path / 'old.csv', [('20/11/2025', '', '', '1.00', '')])
+    merged = merge_price_snapshots.merge_snapshots([old])
+
+    new = write_snapshot(tmp_path / 'new.csv', [
+        ('21/11/2025', '', '', '3.00', ''),
+        ('19/11/2025', '', '', '2.00', ''),
+        ('17/11/2025', '', '', '0.50', ''),
+        ('not a date', '', '', '', ''),
+    ])
+    merged = merge_price_snapshots.merge_snapshots([new], merged)
+
+    # The window starts on 18/11, so reading stops at 17/11 and never reaches the broken row
+    assert list(merged['ICCO daily price (US$/tonne)']) == [2.0, 1.0, 3.0]
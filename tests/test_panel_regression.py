@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import panel_regression
+from panel_regression import CLIMATE_VARIABLES, PRICE_VARIABLE, TARGET
+
+
+def make_fact_table(n_years=25, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for country in ['Ghana', 'Brazil']:
+        df = pd.DataFrame({'Country': country, 'date_id': np.arange(1990, 1990 + n_years)})
+        for variable in CLIMATE_VARIABLES + [PRICE_VARIABLE]:
+            df[variable] = rng.normal(size=n_years)
+        df[TARGET] = 300 + 20 * df['Yearly Average Temperature'] + rng.normal(size=n_years)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_batched_fit_matches_lstsq():
+    fact_df = make_fact_table()
+    panel = panel_regression.build_panel(fact_df, max_lag=1)
+    spec = panel_regression.build_specs(['Brazil', 'Ghana'], max_lag=1, max_variables=1)[-1]
+
+    fit = panel_regression.fit_batch(panel, [spec])
+
+    sample = panel[panel['Country'].isin(spec['countries'])].dropna(subset=spec['terms'] + [TARGET])
+    expected, *_ = np.linalg.lstsq(sample[spec['terms']].to_numpy(), sample[TARGET].to_numpy(), rcond=None)
+    np.testing.assert_allclose(fit['coefficients'][0, :len(spec['terms'])], expected, rtol=1e-10)
+
+
+def test_collinear_terms_do_not_count_as_parameters():
+    fact_df = make_fact_table()
+    # A duplicated variable adds a term but no information
+    fact_df['Yearly Max Temperature'] = fact_df['Yearly Min Temperature']
+
+    _, fits_df, _ = panel_regression.run_regressions(fact_df, max_lag=0, max_variables=2)
+
+    columns = ['N', 'Rank', 'R-squared', 'Adj. R-squared', 'Residual SE', 'AIC']
+    single = fits_df[fits_df['Climate Variables'] == 'Yearly Min Temperature'].set_index(['Group', 'Price'])
+    both = fits_df[fits_df['Climate Variables'] == 'Yearly Min Temperature + Yearly Max Temperature']
+    both = both.set_index(['Group', 'Price'])
+    assert (both['Parameters'] == single['Parameters'] + 1).all()
+    pd.testing.assert_frame_equal(both[columns], single[columns], check_exact=False, rtol=1e-9)
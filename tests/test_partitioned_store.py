@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+import partitioned_store
+
+
+def test_round_trip_with_filters(tmp_path):
+    df = pd.DataFrame({'Country': ['Ghana', "Cote d'Ivoire", 'Ghana'], 'year': [1997, 1997, 1998], 'value': [1, 2, 3]})
+    partitioned_store.write_partitioned(df, str(tmp_path), 'Country', 'year')
+
+    result = partitioned_store.read_partitioned(str(tmp_path), countries=["Cote d'Ivoire", 'Ghana'], years=[1997])
+
+    assert sorted(result['value']) == [1, 2]
+
+
+def test_rows_without_a_partition_key_are_rejected(tmp_path):
+    fact_df = pd.DataFrame({'country_id': [3, 9], 'date_id': [1997, 1997]})
+    dim_country = pd.DataFrame({'Country': ['Ghana'], 'country_id': [3]})
+    df = fact_df.merge(dim_country, on='country_id', how='left')
+    (tmp_path / 'existing').mkdir()
+
+    with pytest.raises(ValueError, match='1 rows'):
+        partitioned_store.write_partitioned(df, str(tmp_path), 'Country', 'date_id')
+    # The existing table is left alone
+    assert (tmp_path / 'existing').exists()
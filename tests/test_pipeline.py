@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import clean_and_aggregate_climate
+import clean_price
+import combine_price_sources
+import config
+import pipeline
+import price_volatility
+from conftest import SCRIPTS_DIR
+
+DATASETS_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'datasets')
+
+
+def test_pandas_pipeline_does_not_import_polars():
+    code = "import sys, pipeline; pipeline.build_stages('pandas'); print('polars' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_fact_table_checkpoint_keeps_the_existing_values(project_root):
+    fact_file = os.path.join(config.get_path('star_schema_dir'), 'fact_table.csv')
+    shutil.copy(os.path.join(DATASETS_DIR, 'star_schema', 'fact_table.csv'), fact_file)
+    shutil.copy(os.path.join(DATASETS_DIR, 'price', 'raw', 'daily_price_raw.csv'), config.get_path('daily_price_raw'))
+    stages = [stage for stage in pipeline.STAGES if stage.name in ('load_daily_prices', 'price_statistics', 'fact_table')]
+
+    pipeline.run_pipeline(checkpoints=['fact_table'], stages=stages)
+
+    with open(os.path.join(DATASETS_DIR, 'star_schema', 'fact_table.csv')) as f:
+        original = f.read().splitlines()
+    with open(fact_file) as f:
+        updated = f.read().splitlines()
+    n_columns = len(original[0].split(','))
+    assert [line.split(',')[:n_columns] for line in updated] == [line.split(',') for line in original]
+
+
+def read_tree(root) -> dict:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(directory, name), 'rb') as f:
+                files[os.path.relpath(os.path.join(directory, name), root)] = f.read()
+    return files
+
+
+def run_in_copy(root, run):
+    # Runs `run` on a copy of the repository's datasets and returns the files afterwards
+    shutil.copytree(DATASETS_DIR, root / 'datasets')
+    (root / 'config.json').write_text(json.dumps({'root': '.'}))
+    config.load_config(str(root / 'config.json'))
+    try:
+        run()
+    finally:
+        config.load_config()
+    return read_tree(root / 'datasets')
+
+
+def test_pipeline_writes_the_files_of_the_individual_stages(tmp_path):
+    def run_stages():
+        clean_and_aggregate_climate.main()
+        clean_price.main()
+        combine_price_sources.main()
+        price_volatility.main()
+
+    stage_files = run_in_copy(tmp_path / 'stages', run_stages)
+    pipeline_files = run_in_copy(tmp_path / 'pipeline', pipeline.run_pipeline)
+
+    assert sorted(stage_files) == sorted(pipeline_files)
+    # The quality reports describe the run: the pipeline validates the price table once more after
+    # the ICCO rows are added, clean-price only before
+    assert [name for name in stage_files
+            if stage_files[name] != pipeline_files[name] and not name.startswith('quality')] == []
+    # Unchanged data is written back unchanged
+    assert read_tree(os.path.join(DATASETS_DIR, 'climate')) == read_tree(tmp_path / 'pipeline' / 'datasets' / 'climate')
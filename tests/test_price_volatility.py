@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import price_volatility
+from conftest import SCRIPTS_DIR
+
+FACT_TABLE = os.path.join(os.path.dirname(SCRIPTS_DIR), 'datasets', 'star_schema', 'fact_table.csv')
+
+
+def write_daily_prices(path):
+    # Newest-first with thousands separators, like the ICCO export
+    dates = pd.date_range('1997-01-01', '1998-12-31', freq='B')[::-1]
+    prices = np.linspace(2000, 1500, len(dates))
+    pd.DataFrame({
+        'Date': dates.strftime('%d/%m/%Y'),
+        'London futures (£ sterling/tonne)': '',
+        'New York futures (US$/tonne)': '',
+        'ICCO daily price (US$/tonne)': [f'{p:,.2f}' for p in prices],
+        'ICCO daily price (Euro/tonne)': '',
+    }).to_csv(path, index=False)
+
+
+def test_save_fact_table_round_trips_byte_for_byte(tmp_path):
+    output = tmp_path / 'fact_table.csv'
+    price_volatility.save_fact_table(price_volatility.read_fact_table(FACT_TABLE), str(output))
+
+    with open(FACT_TABLE, 'rb') as expected:
+        assert output.read_bytes() == expected.read()
+
+
+def test_main_only_adds_the_measure_columns(project_root):
+    fact_file = project_root / 'datasets' / 'star_schema' / 'fact_table.csv'
+    shutil.copy(FACT_TABLE, fact_file)
+    write_daily_prices(project_root / 'datasets' / 'price' / 'raw' / 'daily_price_raw.csv')
+
+    price_volatility.main()
+
+    with open(FACT_TABLE) as f:
+        original = f.read().splitlines()
+    updated = fact_file.read_text().splitlines()
+    assert len(updated) == len(original)
+    n_columns = len(original[0].split(','))
+    for before, after in zip(original, updated):
+        assert after.split(',')[:n_columns] == before.split(',')
+    assert updated[0].split(',')[n_columns:] == [f'"{c}"' for c in price_volatility.MEASURE_COLUMNS]
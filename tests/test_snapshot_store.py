@@ -0,0 +1,70 @@
+import pytest
+
+import cocoa_etl
+import snapshot_store
+
+
+def test_new_commit_alone_does_not_create_a_version(tmp_path, monkeypatch):
+    output = tmp_path / 'out.csv'
+    output.write_text('a,b\n1,2\n')
+    store = snapshot_store.SnapshotStore(str(tmp_path / 'store'))
+
+    monkeypatch.setattr(snapshot_store, 'git_commit', lambda: 'a' * 40)
+    first = store.create_version('stage', [str(output)])
+    monkeypatch.setattr(snapshot_store, 'git_commit', lambda: 'b' * 40)
+    second = store.create_version('stage', [str(output)])
+
+    assert second['version'] == first['version']
+    assert first['git_commit'] == 'a' * 40
+    assert len(store.list_versions('stage')) == 1
+
+    output.write_text('a,b\n1,3\n')
+    third = store.create_version('stage', [str(output)])
+    assert third['version'] != first['version'] and third['git_commit'] == 'b' * 40
+
+
+def test_checkout_restores_an_earlier_version(tmp_path):
+    output = tmp_path / 'out.csv'
+    output.write_text('v1\n')
+    store = snapshot_store.SnapshotStore(str(tmp_path / 'store'))
+    first = store.create_version('stage', [str(output)])
+    output.write_text('v2\n')
+    store.create_version('stage', [str(output)])
+
+    store.checkout('stage', str(tmp_path / 'old'), version=first['version'])
+
+    assert (tmp_path / 'old' / 'out.csv').read_text() == 'v1\n'
+
+
+def test_cli_checkout_without_stages_fails(project_root):
+    with pytest.raises(SystemExit) as error:
+        cocoa_etl.main(['--config', str(project_root / 'config.json'), 'snapshot', 'checkout'])
+    assert 'needs the stages' in str(error.value.code)
+
+
+def test_versions_created_in_quick_succession_keep_their_order(tmp_path):
+    output = tmp_path / 'out.csv'
+    store = snapshot_store.SnapshotStore(str(tmp_path / 'store'))
+
+    created = []
+    for content in ['A\n', 'B\n', 'A\n']:
+        output.write_text(content)
+        created.append(store.create_version('stage', [str(output)]))
+
+    # The third version has the content of the first, but neither replaces the other
+    versions = store.list_versions('stage')
+    assert [m['version'] for m in versions] == [m['version'] for m in created]
+    assert [m['sequence'] for m in versions] == [1, 2, 3]
+    assert versions[0] == created[0]
+    assert store.latest_version('stage')['version'] == created[2]['version']
+    assert store.latest_version('stage')['files'] == created[0]['files']
+
+    # Unchanged since the latest version, i.e. the third, not the second
+    assert store.create_version('stage', [str(output)])['version'] == created[2]['version']
+
+
+def test_cli_checkout_of_a_missing_version_fails(project_root):
+    with pytest.raises(SystemExit) as error:
+        cocoa_etl.main(['--config', str(project_root / 'config.json'), 'snapshot', 'checkout', 'star_schema',
+                        '--as-of', '2026-01-01'])
+    assert "No version of 'star_schema' found" in str(error.value.code)